@@ -0,0 +1,232 @@
+import asyncio
+import json
+import threading
+import urllib.request
+from datetime import datetime
+import config
+
+# Human readable message per (signal, new state) transition
+TRANSITION_MESSAGES = {
+    ("SMA_Cross", "GOLDEN"): "Golden Cross: SMA50 crossed above SMA200",
+    ("SMA_Cross", "DEATH"): "Death Cross: SMA50 crossed below SMA200",
+    ("RSI_Zone", "OVERBOUGHT"): "RSI entered overbought zone (> 70)",
+    ("RSI_Zone", "OVERSOLD"): "RSI entered oversold zone (< 30)",
+    ("RSI_Zone", "NEUTRAL"): "RSI returned to neutral zone (30-70)",
+    ("MACD_Side", "BULLISH"): "MACD crossed above its signal line",
+    ("MACD_Side", "BEARISH"): "MACD crossed below its signal line",
+    ("Bollinger", "ABOVE"): "Price broke above the upper Bollinger band",
+    ("Bollinger", "BELOW"): "Price broke below the lower Bollinger band",
+    ("Bollinger", "INSIDE"): "Price moved back inside the Bollinger bands",
+}
+
+class AlertEngine:
+    """
+    Detects signal transitions between consecutive analysis reports of a ticker.
+    Only the discrete state of the previous report is kept, so each update is O(1).
+    """
+
+    def __init__(self, dispatcher=None):
+        self.dispatcher = dispatcher
+        self._states = {}
+
+    @staticmethod
+    def _signal_state(report):
+        """Reduce an analysis report to the discrete states alerts are raised on."""
+        trend = report["Trend"]
+        momentum = report["Momentum"]
+        volatility = report["Volatility"]
+
+        rsi = momentum["RSI"]
+        rsi_zone = "NEUTRAL"
+        if rsi > 70:
+            rsi_zone = "OVERBOUGHT"
+        elif rsi < 30:
+            rsi_zone = "OVERSOLD"
+
+        price = trend["Price"]
+        bollinger = "INSIDE"
+        if price > volatility["BB_Upper"]:
+            bollinger = "ABOVE"
+        elif price < volatility["BB_Lower"]:
+            bollinger = "BELOW"
+
+        return {
+            "SMA_Cross": "GOLDEN" if trend["SMA50"] > trend["SMA200"] else "DEATH",
+            "RSI_Zone": rsi_zone,
+            "MACD_Side": "BULLISH" if momentum["MACD"] > momentum["MACD_Signal_Line"] else "BEARISH",
+            "Bollinger": bollinger,
+        }
+
+    def update(self, ticker, report):
+        """
+        Compare a new report with the previous one for the same ticker and
+        publish an alert for every signal that changed state.
+        The first report of a ticker only sets the baseline.
+
+        Returns:
+            list: The alerts raised (dicts), possibly empty.
+        """
+        if "Trend" not in report:
+            return []
+
+        state = self._signal_state(report)
+        previous = self._states.get(ticker)
+        self._states[ticker] = state
+        if previous is None:
+            return []
+
+        alerts = []
+        for signal, value in state.items():
+            if previous[signal] != value:
+                alerts.append({
+                    "Ticker": ticker,
+                    "Date": datetime.now(),
+                    "Signal": signal,
+                    "From": previous[signal],
+                    "To": value,
+                    "Message": TRANSITION_MESSAGES[(signal, value)],
+                    "Price": report["Trend"]["Price"],
+                })
+
+        if self.dispatcher:
+            for alert in alerts:
+                self.dispatcher.publish(alert)
+        return alerts
+
+    def has_baseline(self, ticker):
+        return ticker in self._states
+
+    def close(self):
+        if self.dispatcher:
+            self.dispatcher.stop()
+
+class FileAlertSink:
+    """Appends alerts as JSON lines to a file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alert):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alert, default=str) + "\n")
+
+class WebhookAlertSink:
+    """POSTs alerts as JSON to an HTTP endpoint."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        body = json.dumps(alert, default=str).encode("utf-8")
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+class MongoAlertSink:
+    """Stores alerts in the Alerts collection."""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def send(self, alert):
+        self.db_manager.save_alert(alert)
+
+class AlertDispatcher:
+    """
+    Fans alerts out to the sinks from an asyncio queue served by its own thread.
+    publish() is thread safe and never blocks; when the queue is full
+    (config.ALERT_QUEUE_MAXSIZE) the alert is dropped instead of stalling the caller.
+    """
+
+    def __init__(self, sinks):
+        self.sinks = sinks
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._queue = asyncio.Queue(maxsize=config.ALERT_QUEUE_MAXSIZE)
+        self._worker = self._loop.create_task(self._consume())
+        self._ready.set()
+        try:
+            self._loop.run_until_complete(self._worker)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _consume(self):
+        while True:
+            alert = await self._queue.get()
+            try:
+                # Sinks do blocking I/O; run them side by side in worker threads
+                results = await asyncio.gather(
+                    *(asyncio.to_thread(sink.send, dict(alert)) for sink in self.sinks),
+                    return_exceptions=True
+                )
+                for sink, result in zip(self.sinks, results):
+                    if isinstance(result, Exception):
+                        print(f"Alert sink {type(sink).__name__} failed: {result}")
+            finally:
+                self._queue.task_done()
+
+    def _enqueue(self, alert):
+        try:
+            self._queue.put_nowait(alert)
+        except asyncio.QueueFull:
+            print(f"Alert queue full, dropping alert for {alert['Ticker']}")
+
+    def publish(self, alert):
+        self._loop.call_soon_threadsafe(self._enqueue, alert)
+
+    def stop(self, timeout=5):
+        """Deliver the alerts still queued (up to `timeout` seconds), then stop."""
+        if not self._thread.is_alive():
+            return
+        drain = asyncio.run_coroutine_threadsafe(asyncio.wait_for(self._queue.join(), timeout), self._loop)
+        try:
+            drain.result(timeout + 1)
+        except Exception:
+            print("Timed out delivering pending alerts.")
+        self._loop.call_soon_threadsafe(self._worker.cancel)
+        self._thread.join(timeout=2)
+
+def build_alert_engine(db_manager=None):
+    """Create an AlertEngine with the sinks listed in config.ALERT_SINKS."""
+    sinks = []
+    for name in config.ALERT_SINKS:
+        if name == "file":
+            sinks.append(FileAlertSink(config.ALERT_FILE_PATH))
+        elif name == "webhook":
+            sinks.append(WebhookAlertSink(config.ALERT_WEBHOOK_URL))
+        elif name == "mongo" and db_manager:
+            sinks.append(MongoAlertSink(db_manager))
+        else:
+            print(f"Alert sink '{name}' is not available, ignoring it.")
+    dispatcher = AlertDispatcher(sinks).start() if sinks else None
+    return AlertEngine(dispatcher)
+
+if __name__ == "__main__":
+    # Local webhook stub: prints every alert POSTed to config.ALERT_WEBHOOK_URL
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.parse import urlparse
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            print(f"ALERT: {self.rfile.read(length).decode('utf-8')}")
+            self.send_response(204)
+            self.end_headers()
+
+    url = urlparse(config.ALERT_WEBHOOK_URL)
+    print(f"Webhook stub listening on {config.ALERT_WEBHOOK_URL}")
+    HTTPServer((url.hostname, url.port), StubHandler).serve_forever()
@@ -0,0 +1,222 @@
+import asyncio
+import time
+from datetime import datetime
+import httpx
+import pandas as pd
+from motor.motor_asyncio import AsyncIOMotorClient
+import pymongo
+import config
+from db_manager import stock_data_fingerprint
+from stock_analyzer import StockAnalyzer
+
+class AsyncDBManager:
+    """Async (Motor) counterpart of DBManager, limited to what the monitor loop needs."""
+
+    def __init__(self):
+        self.client = AsyncIOMotorClient(config.MONGO_URI)
+        self.db = self.client[config.DB_NAME]
+        # Last written OHLCV fingerprint per ticker, same semantics as DBManager
+        self._last_fingerprints = {}
+
+    async def get_my_stocks(self):
+        """Retrieve all stocks from MyStocks collection."""
+        return await self.db[config.COLLECTION_MY_STOCKS].find().to_list(length=None)
+
+    async def get_configuration(self):
+        """Get the loop interval configuration."""
+        config_doc = await self.db[config.COLLECTION_CONFIGURATION].find_one()
+        if config_doc and "loop_interval_seconds" in config_doc:
+            return config_doc["loop_interval_seconds"]
+        return config.DEFAULT_LOOP_INTERVAL_SECONDS
+
+    async def save_stock_data(self, stock_data):
+        """
+        Save fetched stock data to StockData collection, skipping unchanged snapshots.
+
+        Returns:
+            InsertOneResult, or None if the snapshot carried no new information.
+        """
+        ticker = stock_data.get("Ticker")
+        fingerprint = stock_data_fingerprint(stock_data)
+        if config.DEDUP_STOCK_DATA:
+            if ticker not in self._last_fingerprints:
+                last_doc = await self.db[config.COLLECTION_STOCK_DATA].find_one(
+                    {"Ticker": ticker},
+                    sort=[("Date", pymongo.DESCENDING)]
+                )
+                self._last_fingerprints[ticker] = stock_data_fingerprint(last_doc) if last_doc else None
+            if fingerprint == self._last_fingerprints[ticker]:
+                return None
+
+        result = await self.db[config.COLLECTION_STOCK_DATA].insert_one(stock_data)
+        self._last_fingerprints[ticker] = fingerprint
+        return result
+
+    def close(self):
+        self.client.close()
+
+async def fetch_chart(client, ticker_symbol, period="1y"):
+    """
+    Fetches daily bars for a ticker from the Yahoo chart endpoint (config.YAHOO_CHART_URL).
+
+    Returns:
+        pandas.DataFrame: OHLCV history indexed by date, or None if failed.
+    """
+    try:
+        url = config.YAHOO_CHART_URL.format(ticker=ticker_symbol)
+        response = await client.get(url, params={"range": period, "interval": "1d"})
+        response.raise_for_status()
+        result = response.json()["chart"]["result"]
+        if not result or "timestamp" not in result[0]:
+            print(f"No data found for {ticker_symbol}")
+            return None
+
+        quote = result[0]["indicators"]["quote"][0]
+        hist = pd.DataFrame(
+            {
+                "Open": quote.get("open"),
+                "High": quote.get("high"),
+                "Low": quote.get("low"),
+                "Close": quote.get("close"),
+                "Volume": quote.get("volume"),
+            },
+            index=pd.to_datetime(result[0]["timestamp"], unit="s"),
+            dtype=float,
+        ).dropna(subset=["Close"])
+        if hist.empty:
+            print(f"No data found for {ticker_symbol}")
+            return None
+        return hist
+    except Exception as e:
+        print(f"Error fetching data for {ticker_symbol}: {e}")
+        return None
+
+def latest_stock_data(ticker_symbol, hist):
+    """Builds a StockData document from the last row of a history frame (same shape as DataFetcher.fetch_stock_data)."""
+    latest = hist.iloc[-1]
+    return {
+        "Ticker": ticker_symbol,
+        "Date": datetime.now(),
+        "Open": float(latest["Open"]),
+        "High": float(latest["High"]),
+        "Low": float(latest["Low"]),
+        "Close": float(latest["Close"]),
+        "Volume": int(latest["Volume"]) if pd.notna(latest["Volume"]) else 0,
+    }
+
+async def process_ticker(client, db_manager, semaphore, ticker, report_callback=None):
+    """
+    Fetch, save and analyze one ticker. A single 1y chart request provides both
+    the latest bar and the history for the deep analysis.
+
+    Returns:
+        str: "saved", "unchanged" or "failed".
+    """
+    async with semaphore:
+        hist = await fetch_chart(client, ticker, period="1y")
+    if hist is None:
+        return "failed"
+
+    data = latest_stock_data(ticker, hist)
+    saved = await db_manager.save_stock_data(data)
+
+    # Indicator math is CPU bound, keep it off the event loop
+    report = await asyncio.to_thread(lambda: StockAnalyzer(hist).evaluate())
+    if report_callback:
+        report_callback(ticker, report)
+    return "saved" if saved else "unchanged"
+
+async def _wait_for_stop(stop_event):
+    """Completes once the (threading) stop_event is set."""
+    while not stop_event.is_set():
+        await asyncio.sleep(0.2)
+
+async def run_cycle(client, db_manager, semaphore, report_callback=None):
+    """Runs one monitoring cycle over the whole MyStocks watchlist concurrently."""
+    my_stocks = await db_manager.get_my_stocks()
+    if not my_stocks:
+        print("No stocks in MyStocks. Please add stocks to the database.")
+
+    tickers = []
+    for stock in my_stocks:
+        ticker = stock.get('ShortName')
+        if not ticker:
+            print(f"Skipping stock with no ShortName: {stock}")
+            continue
+        tickers.append(ticker)
+
+    start_time = time.monotonic()
+    results = await asyncio.gather(
+        *(process_ticker(client, db_manager, semaphore, ticker, report_callback) for ticker in tickers),
+        return_exceptions=True
+    )
+    elapsed = time.monotonic() - start_time
+
+    saved_count = results.count("saved")
+    skipped_count = results.count("unchanged")
+    failed_count = len(results) - saved_count - skipped_count
+    for ticker, result in zip(tickers, results):
+        if isinstance(result, Exception):
+            print(f"Error processing {ticker}: {result}")
+
+    total_count = saved_count + skipped_count
+    if total_count:
+        dedup_ratio = (skipped_count / total_count) * 100
+        print(f"Snapshots: {saved_count} saved, {skipped_count} unchanged (dedup ratio {dedup_ratio:.1f}%)")
+    if failed_count:
+        print(f"Failed tickers: {failed_count}")
+    if tickers and elapsed > 0:
+        print(f"Cycle throughput: {len(tickers)} tickers in {elapsed:.2f}s ({len(tickers) / elapsed:.1f} tickers/sec)")
+
+async def run_loop_async(stop_event=None, report_callback=None):
+    """
+    Asyncio counterpart of main.run_loop. Up to config.ASYNC_MAX_CONCURRENCY
+    requests are in flight at once; setting stop_event cancels the running cycle.
+    """
+    print("Starting Stock Market App Loop (async engine)...")
+    db_manager = AsyncDBManager()
+    semaphore = asyncio.Semaphore(config.ASYNC_MAX_CONCURRENCY)
+    limits = httpx.Limits(max_connections=config.ASYNC_MAX_CONCURRENCY)
+    headers = {"User-Agent": "Mozilla/5.0"}
+    stop_task = asyncio.create_task(_wait_for_stop(stop_event)) if stop_event else None
+
+    try:
+        async with httpx.AsyncClient(timeout=config.ASYNC_HTTP_TIMEOUT_SECONDS, limits=limits, headers=headers) as client:
+            while True:
+                try:
+                    interval = await db_manager.get_configuration()
+                    print(f"\n--- Starting cycle (Interval: {interval}s) ---")
+
+                    cycle_task = asyncio.create_task(run_cycle(client, db_manager, semaphore, report_callback))
+                    waiting = {cycle_task, stop_task} if stop_task else {cycle_task}
+                    await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                    if not cycle_task.done():
+                        print("Stopping loop via signal, cancelling in-flight requests...")
+                        cycle_task.cancel()
+                        await asyncio.gather(cycle_task, return_exceptions=True)
+                        break
+                    cycle_task.result()
+
+                    print(f"--- Cycle complete. Sleeping for {interval} seconds ---")
+                    if stop_task:
+                        await asyncio.wait({stop_task}, timeout=interval)
+                        if stop_task.done():
+                            print("Stopping loop via signal...")
+                            break
+                    else:
+                        await asyncio.sleep(interval)
+                except Exception as e:
+                    print(f"An error occurred in the main loop: {e}")
+                    # Sleep a bit to avoid rapid error loops
+                    await asyncio.sleep(5)
+    finally:
+        if stop_task:
+            stop_task.cancel()
+        db_manager.close()
+
+def run_async_engine(stop_event=None, report_callback=None):
+    """Blocking entry point, usable as a threading.Thread target like main.run_loop."""
+    try:
+        asyncio.run(run_loop_async(stop_event, report_callback))
+    except KeyboardInterrupt:
+        print("\nStopping application...")
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import multiprocessing
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import numpy as np
+import pandas as pd
+import config
+import async_monitor
+from stock_analyzer import StockAnalyzer
+
+TICKER_COUNTS = [20, 100, 300]
+# config.ASYNC_MAX_CONCURRENCY values tried on the largest watchlist
+CONCURRENCY_LEVELS = [10, 25, 50, 100, 200]
+# Round trip of the stand-in endpoint, roughly what a Yahoo chart request costs
+LATENCY_SECONDS = 0.05
+BARS = 252
+
+def chart_payload(bars=BARS, seed=0):
+    """A Yahoo chart response (the fields fetch_chart reads) with a random walk."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, bars))
+    timestamps = pd.bdate_range("2024-01-01", periods=bars).astype("int64") // 10**9
+    quote = {
+        "open": close.tolist(),
+        "high": (close * 1.01).tolist(),
+        "low": (close * 0.99).tolist(),
+        "close": close.tolist(),
+        "volume": [1_000_000] * bars,
+    }
+    return json.dumps({"chart": {"result": [{"timestamp": timestamps.tolist(), "indicators": {"quote": [quote]}}]}}).encode()
+
+def serve(latency, port_queue):
+    """Local stand-in for config.YAHOO_CHART_URL; every request sleeps `latency` seconds."""
+    body = chart_payload()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+def start_server(latency):
+    """Runs the stand-in in its own process, so it does not share the GIL with the engines."""
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(latency, port_queue), daemon=True)
+    process.start()
+    return process, port_queue.get()
+
+def read_chart(response):
+    result = response.json()["chart"]["result"][0]
+    quote = result["indicators"]["quote"][0]
+    return pd.DataFrame(
+        {"Close": quote["close"]}, index=pd.to_datetime(result["timestamp"], unit="s"), dtype=float
+    )
+
+def run_sync(tickers):
+    """The run_loop pattern: per ticker, a latest quote then a 1y history request, one after another."""
+    url = config.YAHOO_CHART_URL
+    with httpx.Client(timeout=config.ASYNC_HTTP_TIMEOUT_SECONDS) as client:
+        for ticker in tickers:
+            read_chart(client.get(url.format(ticker=ticker), params={"range": "1d", "interval": "1d"}))
+            hist = read_chart(client.get(url.format(ticker=ticker), params={"range": "1y", "interval": "1d"}))
+            StockAnalyzer(hist).evaluate()
+
+class MemoryDB:
+    """Stands in for AsyncDBManager so only fetching and analysis are timed."""
+
+    async def save_stock_data(self, stock_data):
+        return True
+
+async def run_async(tickers, concurrency=config.ASYNC_MAX_CONCURRENCY):
+    """The async engine's cycle: async_monitor.process_ticker for every ticker at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=config.ASYNC_HTTP_TIMEOUT_SECONDS, limits=limits) as client:
+        results = await asyncio.gather(
+            *(async_monitor.process_ticker(client, MemoryDB(), semaphore, ticker) for ticker in tickers)
+        )
+    failed = len(results) - results.count("saved")
+    if failed:
+        raise RuntimeError(f"{failed} ticker(s) failed")
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    server, port = start_server(LATENCY_SECONDS)
+    config.YAHOO_CHART_URL = f"http://127.0.0.1:{port}/v8/finance/chart/{{ticker}}"
+    print(f"Stand-in chart endpoint at {config.YAHOO_CHART_URL} ({LATENCY_SECONDS * 1000:.0f} ms per request, {BARS} bars)")
+
+    header = f"{'Tickers':>8}{'sync (s)':>12}{'tickers/s':>12}{'async (s)':>12}{'tickers/s':>12}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    # Warm up (imports, connection setup)
+    run_sync(["WARM"])
+    asyncio.run(run_async(["WARM"]))
+
+    for count in TICKER_COUNTS:
+        tickers = [f"T{i:04d}" for i in range(count)]
+        sync_s = timed(lambda: run_sync(tickers))
+        async_s = timed(lambda: asyncio.run(run_async(tickers)))
+        print(f"{count:>8}{sync_s:>12.2f}{count / sync_s:>12.1f}{async_s:>12.2f}{count / async_s:>12.1f}{sync_s / async_s:>8.1f}x")
+
+    count = TICKER_COUNTS[-1]
+    tickers = [f"T{i:04d}" for i in range(count)]
+    print(f"\nAsync engine, {count} tickers")
+    header = f"{'Limit':>8}{'async (s)':>12}{'tickers/s':>12}"
+    print(header)
+    print("-" * len(header))
+    for concurrency in CONCURRENCY_LEVELS:
+        async_s = timed(lambda: asyncio.run(run_async(tickers, concurrency)))
+        print(f"{concurrency:>8}{async_s:>12.2f}{count / async_s:>12.1f}")
+    server.terminate()
+
+if __name__ == "__main__":
+    main()
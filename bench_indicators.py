@@ -0,0 +1,83 @@
+import timeit
+import numpy as np
+import pandas as pd
+from indicator_kernels import NumpyKernels, NumbaKernels
+
+LENGTHS = [252, 1260, 5040, 50400]
+
+def pandas_indicators(series):
+    """The pandas implementations used by StockAnalyzer, on a plain Series."""
+    def rsi():
+        delta = series.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        return 100 - (100 / (1 + gain / loss))
+
+    def macd():
+        macd_line = series.ewm(span=12, adjust=False).mean() - series.ewm(span=26, adjust=False).mean()
+        return macd_line.ewm(span=9, adjust=False).mean()
+
+    def drawdown():
+        rolling_max = series.cummax()
+        return ((series - rolling_max) / rolling_max).min()
+
+    return {
+        "SMA200": lambda: series.rolling(window=200).mean(),
+        "RollingStd20": lambda: series.rolling(window=20).std(),
+        "RSI14": rsi,
+        "EMA26": lambda: series.ewm(span=26, adjust=False).mean(),
+        "MACD": macd,
+        "Drawdown": drawdown,
+        "Return252": lambda: (series.iloc[-1] - series.iloc[-min(252, len(series) - 1)]) / series.iloc[-min(252, len(series) - 1)],
+    }
+
+def kernel_indicators(kernels, values):
+    return {
+        "SMA200": lambda: kernels.sma(values, 200),
+        "RollingStd20": lambda: kernels.rolling_std(values, 20),
+        "RSI14": lambda: kernels.rsi(values, 14),
+        "EMA26": lambda: kernels.ema(values, 26),
+        "MACD": lambda: kernels.macd(values),
+        "Drawdown": lambda: kernels.drawdown(values).min(),
+        "Return252": lambda: kernels.total_return(values, 252),
+    }
+
+def best_time(func, repeat=3):
+    """Best per-call time in microseconds."""
+    number, _ = timeit.Timer(func).autorange()
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+def main():
+    backends = {"numpy": NumpyKernels}
+    if NumbaKernels is not None:
+        backends["numba"] = NumbaKernels
+    else:
+        print("Numba is not installed, benchmarking NumPy only.")
+
+    header = f"{'Indicator':<14}{'Length':>8}{'pandas (us)':>14}"
+    for name in backends:
+        header += f"{name + ' (us)':>14}{'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+
+    rng = np.random.default_rng(0)
+    for length in LENGTHS:
+        values = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, length))
+        series = pd.Series(values, index=pd.bdate_range("2000-01-01", periods=length))
+        reference = pandas_indicators(series)
+        candidates = {name: kernel_indicators(kernels, values) for name, kernels in backends.items()}
+        # Warm up (JIT compilation for numba)
+        for funcs in candidates.values():
+            for func in funcs.values():
+                func()
+
+        for indicator, func in reference.items():
+            pandas_us = best_time(func)
+            row = f"{indicator:<14}{length:>8}{pandas_us:>14.1f}"
+            for name in backends:
+                kernel_us = best_time(candidates[name][indicator])
+                row += f"{kernel_us:>14.1f}{pandas_us / kernel_us:>8.1f}x"
+            print(row)
+
+if __name__ == "__main__":
+    main()
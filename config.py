@@ -7,7 +7,61 @@ DB_NAME = "stock_market"
 COLLECTION_MY_STOCKS = "MyStocks"
 COLLECTION_STOCK_DATA = "StockData"
 COLLECTION_CONFIGURATION = "Configuration"
+COLLECTION_WORKERS = "Workers"
+COLLECTION_TICKER_LEASES = "TickerLeases"
+COLLECTION_ALERTS = "Alerts"
+COLLECTION_QUOTE_CACHE = "QuoteCache"
+COLLECTION_METRICS = "Metrics"
 
 # Default Configuration
 DEFAULT_LOOP_INTERVAL_SECONDS = 60
 ENABLE_MOCK_DATA = False
+
+# Skip StockData writes whose OHLCV values did not change since the last snapshot
+DEDUP_STOCK_DATA = True
+
+# Async monitor engine (run --engine async)
+YAHOO_CHART_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+ASYNC_MAX_CONCURRENCY = 200
+ASYNC_HTTP_TIMEOUT_SECONDS = 10
+
+# Sharded monitoring (run --sharded)
+WORKER_LEASE_TTL_SECONDS = 30
+SHARD_VIRTUAL_NODES = 64
+
+# Alerting on signal transitions (SMA cross, RSI zones, MACD, Bollinger bands)
+ENABLE_ALERTS = True
+ALERT_SINKS = ["file", "mongo"]  # any of "file", "webhook", "mongo"
+ALERT_FILE_PATH = "alerts.log"
+ALERT_WEBHOOK_URL = "http://localhost:8765/alerts"  # `python alert_engine.py` runs a local stub
+ALERT_QUEUE_MAXSIZE = 10000
+
+# Quote/metadata cache used by find-stock and save-stock
+QUOTE_CACHE_TTL_SECONDS = 15
+QUOTE_CACHE_STALE_SECONDS = 60
+METADATA_CACHE_TTL_DAYS = 7
+METADATA_CACHE_STALE_DAYS = 30
+CACHE_LRU_SIZE = 1024
+
+# Bulk watchlist import (save-stocks)
+BULK_IMPORT_WORKERS = 8
+BULK_IMPORT_RATE_PER_SECOND = 5
+BULK_IMPORT_BATCH_SIZE = 500
+
+# Portfolio risk (risk command and per-cycle summary)
+ENABLE_PORTFOLIO_RISK = True
+RISK_BENCHMARK_TICKER = "SPY"
+RISK_WINDOW_DAYS = 60
+RISK_HISTORY_PERIOD = "1y"
+
+# Cycle profiling (shell: profile start|stop|dump)
+PROFILE_OUTPUT_DIR = "profiles"
+PROFILE_TRACEMALLOC_FRAMES = 10
+
+# Indicator math backend for StockAnalyzer: "pandas", "numpy" or "numba"
+# ("numba" needs the optional numba package and falls back to "numpy" without it)
+INDICATOR_BACKEND = "pandas"
+
+# Share of the loop interval a cycle may spend fetching before the remaining
+# (least stale) tickers are deferred to the next cycle
+CYCLE_BUDGET_FRACTION = 0.9
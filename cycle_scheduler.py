@@ -0,0 +1,83 @@
+import math
+import time
+from datetime import datetime
+import config
+
+class CycleScheduler:
+    """
+    Deadline-based scheduling for run_loop.
+
+    Cycles start on a fixed grid (start, start + interval, ...) instead of
+    sleeping `interval` after each cycle, so a slow cycle shortens the next
+    sleep rather than stretching the refresh period. Each cycle gets a budget
+    of config.CYCLE_BUDGET_FRACTION of the interval; tickers are processed
+    most-stale first, and the ones left when the budget runs out are deferred
+    to the next cycle, where they come first.
+    """
+
+    def __init__(self):
+        self.last_polled = {}
+        self.next_start = None
+        self.cycle_start = None
+        self.cycle_deadline = None
+        self.interval = None
+        self._cycle_closed = True
+
+    def start_cycle(self, interval):
+        now = time.monotonic()
+        # Waking up and reading the configuration make every start slightly late;
+        # that is absorbed by the budget. Re-anchor only on the first cycle, when the
+        # previous one never reached end_cycle (e.g. an error), or after a missed slot.
+        if self.next_start is None or not self._cycle_closed or now - self.next_start > interval:
+            self.next_start = now
+        self._cycle_closed = False
+        self.interval = interval
+        self.cycle_start = now
+        self.cycle_deadline = self.next_start + interval * config.CYCLE_BUDGET_FRACTION
+
+    def order(self, stocks):
+        """Stocks sorted most stale first (never polled by this process comes first)."""
+        return sorted(stocks, key=lambda s: self.last_polled.get(s.get('ShortName'), -math.inf))
+
+    def budget_exhausted(self):
+        return time.monotonic() >= self.cycle_deadline
+
+    def mark_polled(self, ticker):
+        self.last_polled[ticker] = time.monotonic()
+
+    def end_cycle(self, processed, deferred):
+        """
+        Close the cycle and schedule the next one.
+
+        Returns:
+            dict: cycle statistics (see DBManager.record_cycle_metrics).
+        """
+        now = time.monotonic()
+        self._cycle_closed = True
+        duration = now - self.cycle_start
+        scheduled_next = self.next_start + self.interval
+        lag = max(0.0, now - scheduled_next)
+        overrun = lag > 0 or deferred > 0
+        # Never try to catch up missed slots: re-anchor the grid on now
+        self.next_start = max(scheduled_next, now)
+
+        total = processed + deferred
+        return {
+            "Date": datetime.now(),
+            "IntervalSeconds": self.interval,
+            "DurationSeconds": round(duration, 3),
+            "LagSeconds": round(lag, 3),
+            "Overrun": overrun,
+            "Processed": processed,
+            "Deferred": deferred,
+            # Time a full pass over the (owned) watchlist would take at this cycle's pace
+            "EstimatedFullCycleSeconds": round(duration / processed * total, 3) if processed else None,
+        }
+
+    def sleep_until_next(self, stop_event=None):
+        """Sleep until the next scheduled start, in chunks to allow faster stopping."""
+        while True:
+            remaining = self.next_start - time.monotonic()
+            if remaining <= 0 or (stop_event and stop_event.is_set()):
+                return
+            time.sleep(min(1.0, remaining))
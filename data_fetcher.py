@@ -1,7 +1,32 @@
 import yfinance as yf
 from datetime import datetime, timedelta
+import threading
+import time
 import config
 
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` acquisitions per second on average."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 class DataFetcher:
     @staticmethod
     def fetch_stock_data(ticker_symbol):
@@ -1,11 +1,22 @@
 import pymongo
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
 import config
 
+# Fields that carry the actual market information of a StockData document.
+# "Date" is excluded on purpose: it is stamped with datetime.now() on every fetch.
+FINGERPRINT_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+def stock_data_fingerprint(stock_data):
+    """Return a hashable fingerprint of the OHLCV values of a StockData document."""
+    return tuple(stock_data.get(field) for field in FINGERPRINT_FIELDS)
+
 class DBManager:
     def __init__(self):
         self.client = MongoClient(config.MONGO_URI)
         self.db = self.client[config.DB_NAME]
+        # Last written OHLCV fingerprint per ticker (write-through cache of StockData)
+        self._last_fingerprints = {}
         self._init_collections()
 
     def _init_collections(self):
@@ -14,6 +25,26 @@ class DBManager:
         # Check if Configuration exists, if not create default
         if config.COLLECTION_CONFIGURATION not in self.db.list_collection_names():
             self.set_configuration(config.DEFAULT_LOOP_INTERVAL_SECONDS)
+        self._ensure_short_name_unique()
+        # Used to spot other listings of the same security (see find_other_listings)
+        self.db[config.COLLECTION_MY_STOCKS].create_index("ISIN")
+        # Used to look up the latest snapshot of a ticker for change detection
+        self.db[config.COLLECTION_STOCK_DATA].create_index(
+            [("Ticker", pymongo.ASCENDING), ("Date", pymongo.DESCENDING)]
+        )
+
+    def _ensure_short_name_unique(self):
+        """ShortName is the ticker the monitor polls: one MyStocks entry per ShortName."""
+        my_stocks = self.db[config.COLLECTION_MY_STOCKS]
+        index = my_stocks.index_information().get("ShortName_1")
+        if index and not index.get("unique"):
+            my_stocks.drop_index("ShortName_1")
+        try:
+            my_stocks.create_index("ShortName", unique=True)
+        except OperationFailure as e:
+            # Existing duplicates (saved before the index existed) must be removed by hand
+            print(f"Warning: could not enforce unique ShortName in {config.COLLECTION_MY_STOCKS}: {e}")
+            my_stocks.create_index("ShortName")
 
     def get_my_stocks(self):
         """Retrieve all stocks from MyStocks collection."""
@@ -31,9 +62,115 @@ class DBManager:
         }
         return self.db[config.COLLECTION_MY_STOCKS].insert_one(stock)
 
+    def upsert_stocks(self, stocks):
+        """
+        Insert or update stocks in MyStocks in a single bulk write, keyed on ShortName.
+        Other listings sharing an ISIN (e.g. RACE.MI and RACE) stay separate entries.
+
+        Args:
+            stocks (list): dicts with FullName, ShortName, ISIN, MarketCountry, Currency, MarketType.
+
+        Returns:
+            tuple: (inserted count, updated count)
+        """
+        requests = []
+        seen = set()
+        for stock in stocks:
+            if stock['ShortName'] in seen:
+                continue
+            seen.add(stock['ShortName'])
+            requests.append(UpdateOne({"ShortName": stock['ShortName']}, {"$set": stock}, upsert=True))
+
+        if not requests:
+            return 0, 0
+        try:
+            result = self.db[config.COLLECTION_MY_STOCKS].bulk_write(requests, ordered=False)
+            return result.upserted_count, result.matched_count
+        except BulkWriteError as e:
+            # A concurrent import inserted the same ShortName first; the unique index kept one entry
+            return e.details.get("nUpserted", 0), e.details.get("nMatched", 0)
+
+    def find_other_listings(self, stocks):
+        """
+        Existing MyStocks entries with the same ISIN but a different ShortName.
+
+        Returns:
+            list: (ShortName, existing ShortName, ISIN) tuples.
+        """
+        by_isin = {}
+        for stock in stocks:
+            if stock.get('ISIN') and stock['ISIN'] not in ('N/A', '-'):
+                by_isin.setdefault(stock['ISIN'], set()).add(stock['ShortName'])
+        if not by_isin:
+            return []
+
+        listings = []
+        existing = self.db[config.COLLECTION_MY_STOCKS].find(
+            {"ISIN": {"$in": list(by_isin)}},
+            projection={"ShortName": 1, "ISIN": 1}
+        )
+        for doc in existing:
+            for short_name in sorted(by_isin[doc['ISIN']]):
+                if doc.get('ShortName') != short_name:
+                    listings.append((short_name, doc.get('ShortName'), doc['ISIN']))
+        return listings
+
     def save_stock_data(self, stock_data):
-        """Save fetched stock data to StockData collection."""
-        return self.db[config.COLLECTION_STOCK_DATA].insert_one(stock_data)
+        """
+        Save fetched stock data to StockData collection.
+        Snapshots whose OHLCV values are identical to the last written one for the
+        same ticker are skipped (see config.DEDUP_STOCK_DATA).
+
+        Returns:
+            InsertOneResult, or None if the snapshot carried no new information.
+        """
+        ticker = stock_data.get("Ticker")
+        fingerprint = stock_data_fingerprint(stock_data)
+        if config.DEDUP_STOCK_DATA and fingerprint == self._get_last_fingerprint(ticker):
+            return None
+
+        result = self.db[config.COLLECTION_STOCK_DATA].insert_one(stock_data)
+        self._last_fingerprints[ticker] = fingerprint
+        return result
+
+    def _get_last_fingerprint(self, ticker):
+        """Last written fingerprint for a ticker, loaded from StockData on first use."""
+        if ticker not in self._last_fingerprints:
+            last_doc = self.db[config.COLLECTION_STOCK_DATA].find_one(
+                {"Ticker": ticker},
+                sort=[("Date", pymongo.DESCENDING)]
+            )
+            self._last_fingerprints[ticker] = stock_data_fingerprint(last_doc) if last_doc else None
+        return self._last_fingerprints[ticker]
+
+    def record_cycle_metrics(self, key, stats):
+        """
+        Accumulate monitoring cycle statistics in Metrics collection (one document per loop/worker).
+        Average duration = TotalDurationSeconds / Cycles; overrun rate = Overruns / Cycles.
+        """
+        self.db[config.COLLECTION_METRICS].update_one(
+            {"_id": key},
+            {
+                "$inc": {
+                    "Cycles": 1,
+                    "Overruns": 1 if stats["Overrun"] else 0,
+                    "TotalDurationSeconds": stats["DurationSeconds"],
+                    "TotalLagSeconds": stats["LagSeconds"],
+                    "DeferredTickers": stats["Deferred"],
+                },
+                "$max": {"MaxDurationSeconds": stats["DurationSeconds"]},
+                "$set": {"LastCycle": stats},
+            },
+            upsert=True
+        )
+
+    def save_alert(self, alert):
+        """Save a signal transition alert to Alerts collection."""
+        return self.db[config.COLLECTION_ALERTS].insert_one(alert)
+
+    def clear_fingerprint_cache(self):
+        """Forget cached fingerprints; they are reloaded from StockData on next save."""
+        self._last_fingerprints.clear()
 
     def find_stock_ticker(self, identifier):
         """Find stock ticker by FullName, ShortName, or ISIN (case-insensitive)."""
@@ -0,0 +1,171 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+_numba_warning_shown = False
+
+# The closed-form EMA scales values by decay**-k; blocks are cut so that this
+# factor stays below e**EMA_MAX_EXPONENT, well inside the float64 range
+EMA_MAX_EXPONENT = 500
+
+class NumpyKernels:
+    """
+    Pure NumPy versions of the StockAnalyzer indicators.
+    Inputs are 1-D float arrays of finite prices (StockAnalyzer falls back to
+    pandas otherwise); outputs have the same length, with NaN where the pandas
+    implementation yields NaN.
+    """
+
+    @staticmethod
+    def sma(values, period):
+        out = np.full(len(values), np.nan)
+        if len(values) >= period:
+            csum = np.concatenate(([0.0], np.cumsum(values)))
+            out[period - 1:] = (csum[period:] - csum[:-period]) / period
+        return out
+
+    @staticmethod
+    def rolling_std(values, period):
+        out = np.full(len(values), np.nan)
+        if len(values) >= period:
+            out[period - 1:] = sliding_window_view(values, period).std(axis=1, ddof=1)
+        return out
+
+    @classmethod
+    def rsi(cls, values, period=14):
+        delta = np.diff(values, prepend=np.nan)
+        gain = cls.sma(np.where(delta > 0, delta, 0.0), period)
+        loss = cls.sma(np.where(delta < 0, -delta, 0.0), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = gain / loss
+            return 100 - (100 / (1 + rs))
+
+    @staticmethod
+    def ema(values, span):
+        """
+        EMA with adjust=False: y[0] = x[0], y[t] = a*x[t] + (1-a)*y[t-1].
+        Evaluated in closed form per block instead of a Python loop:
+        y[k] = b^(k+1)*y_prev + a*b^k*cumsum(x[j]*b^-j).
+        """
+        alpha = 2 / (span + 1)
+        decay = 1 - alpha
+        out = np.empty(len(values))
+        if len(values) == 0:
+            return out
+        if decay == 0:
+            out[:] = values
+            return out
+
+        out[0] = values[0]
+        block_len = max(1, min(len(values), int(EMA_MAX_EXPONENT / -np.log(decay))))
+        powers = decay ** np.arange(block_len + 1)
+        prev = values[0]
+        for start in range(1, len(values), block_len):
+            block = values[start:start + block_len]
+            k = len(block)
+            acc = np.cumsum(block / powers[:k])
+            out[start:start + k] = powers[1:k + 1] * prev + alpha * powers[:k] * acc
+            prev = out[start + k - 1]
+        return out
+
+    @classmethod
+    def macd(cls, values, fast=12, slow=26, signal=9):
+        macd_line = cls.ema(values, fast) - cls.ema(values, slow)
+        signal_line = cls.ema(macd_line, signal)
+        return macd_line, signal_line, macd_line - signal_line
+
+    @staticmethod
+    def drawdown(values):
+        running_max = np.maximum.accumulate(values)
+        return (values - running_max) / running_max
+
+    @staticmethod
+    def total_return(values, lookback=252):
+        """Percent return over the last `lookback` bars, same indexing as calculate_metrics."""
+        limit = min(lookback, len(values) - 1)
+        return (values[-1] - values[-limit]) / values[-limit] * 100
+
+if njit is not None:
+    @njit(cache=True)
+    def _ema_loop(values, span):
+        alpha = 2.0 / (span + 1)
+        out = np.empty(len(values))
+        if len(values) == 0:
+            return out
+        out[0] = values[0]
+        for i in range(1, len(values)):
+            out[i] = alpha * values[i] + (1 - alpha) * out[i - 1]
+        return out
+
+    @njit(cache=True)
+    def _rolling_std_loop(values, period):
+        # Sliding sums of x and x^2 around the window mean (shifted for stability)
+        n = len(values)
+        out = np.full(n, np.nan)
+        if n < period:
+            return out
+        shift = values[0]
+        s = 0.0
+        ss = 0.0
+        for i in range(n):
+            x = values[i] - shift
+            s += x
+            ss += x * x
+            if i >= period:
+                old = values[i - period] - shift
+                s -= old
+                ss -= old * old
+            if i >= period - 1:
+                var = (ss - s * s / period) / (period - 1)
+                out[i] = np.sqrt(var) if var > 0 else 0.0
+        return out
+
+    @njit(cache=True)
+    def _drawdown_loop(values):
+        out = np.empty(len(values))
+        running_max = -np.inf
+        for i in range(len(values)):
+            if values[i] > running_max:
+                running_max = values[i]
+            out[i] = (values[i] - running_max) / running_max
+        return out
+
+    class NumbaKernels(NumpyKernels):
+        """NumpyKernels with the sequential indicators JIT-compiled by Numba."""
+
+        @staticmethod
+        def ema(values, span):
+            return _ema_loop(values, span)
+
+        @staticmethod
+        def rolling_std(values, period):
+            return _rolling_std_loop(values, period)
+
+        @staticmethod
+        def drawdown(values):
+            return _drawdown_loop(values)
+else:
+    NumbaKernels = None
+
+def get_kernels(backend):
+    """
+    Kernel class for an indicator backend ("pandas", "numpy" or "numba").
+    Returns None for "pandas"; "numba" falls back to NumPy when Numba is not installed.
+    """
+    global _numba_warning_shown
+    if backend == "pandas":
+        return None
+    if backend == "numba":
+        if NumbaKernels is not None:
+            return NumbaKernels
+        if not _numba_warning_shown:
+            print("Numba is not installed, using the NumPy indicator backend.")
+            _numba_warning_shown = True
+        return NumpyKernels
+    if backend == "numpy":
+        return NumpyKernels
+    raise ValueError(f"Unknown indicator backend '{backend}'")
@@ -3,9 +3,18 @@ import time
 from datetime import datetime
 import threading
 import cmd
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from db_manager import DBManager
-from data_fetcher import DataFetcher
+from data_fetcher import DataFetcher, RateLimiter
 from stock_analyzer import StockAnalyzer
+from shard_coordinator import ShardCoordinator
+from alert_engine import build_alert_engine
+from quote_cache import get_quote_cache
+from risk_analyzer import PortfolioRisk, close_series
+from profiler import CycleProfiler
+from cycle_scheduler import CycleScheduler
+import config
 
 def analyze_stock(stock_data):
     """
@@ -32,18 +41,37 @@ def analyze_stock(stock_data):
 import argparse
 import sys
 
-def run_loop(stop_event=None):
+# Monitoring engines selectable via "run --engine" and "monitor start"
+ENGINES = ("sync", "async")
+
+def run_loop(stop_event=None, sharded=False, worker_id=None, profiler=None):
     print("Starting Stock Market App Loop...")
     db_manager = DBManager()
     
+    # In sharded mode this process only polls its partition of MyStocks
+    coordinator = None
+    if sharded:
+        coordinator = ShardCoordinator(db_manager, worker_id)
+        coordinator.start()
+    
+    alert_engine = build_alert_engine(db_manager) if config.ENABLE_ALERTS else None
+    risk_model = None
+    risk_histories = {}
+    scheduler = CycleScheduler()
+    metrics_key = f"run_loop:{coordinator.worker_id}" if coordinator else "run_loop"
+    
     while True:
         if stop_event and stop_event.is_set():
             print("Stopping loop via signal...")
             break
 
         try:
+            if profiler:
+                profiler.begin_cycle()
+            
             # 1. Read configuration for loop interval
             interval = db_manager.get_configuration()
+            scheduler.start_cycle(interval)
             print(f"\n--- Starting cycle (Interval: {interval}s) ---")
             
             # 2. Get list of stocks to monitor
@@ -51,24 +79,55 @@ def run_loop(stop_event=None):
             if not my_stocks:
                 print("No stocks in MyStocks. Please add stocks to the database.")
             
-            for stock in my_stocks:
+            if coordinator:
+                if coordinator.refresh():
+                    # Tickers may have been written by other workers meanwhile
+                    db_manager.clear_fingerprint_cache()
+                my_stocks = [s for s in my_stocks if s.get('ShortName') and coordinator.owns(s['ShortName'])]
+                print(f"Worker {coordinator.worker_id} owns {len(my_stocks)} ticker(s)")
+            
+            saved_count = 0
+            skipped_count = 0
+            processed_count = 0
+            deferred_count = 0
+            cycle_start = time.monotonic()
+            cycle_histories = {}
+            
+            # Most stale tickers first, so an exhausted budget defers the freshest ones
+            my_stocks = scheduler.order(my_stocks)
+            for position, stock in enumerate(my_stocks):
                 if stop_event and stop_event.is_set(): break
                 
+                if scheduler.budget_exhausted():
+                    deferred_count = len(my_stocks) - position
+                    print(f"Cycle budget exhausted, deferring {deferred_count} ticker(s) to the next cycle")
+                    break
+                
                 ticker = stock.get('ShortName') # Assuming ShortName is the ticker (e.g. AAPL)
                 
                 if not ticker:
                     print(f"Skipping stock with no ShortName: {stock}")
                     continue
                 
+                if coordinator and not coordinator.claim_ticker(ticker, interval):
+                    print(f"Skipping {ticker}: already polled by another worker this interval")
+                    continue
+                
                 print(f"Processing {ticker}...")
                 
                 # 3. Read delta/fetch data
                 data = DataFetcher.fetch_stock_data(ticker)
+                scheduler.mark_polled(ticker)
+                processed_count += 1
                 
                 if data:
-                    # 4. Save data to StockData
-                    db_manager.save_stock_data(data)
-                    print(f"Saved data for {ticker}")
+                    # 4. Save data to StockData (unchanged snapshots are skipped)
+                    if db_manager.save_stock_data(data):
+                        saved_count += 1
+                        print(f"Saved data for {ticker}")
+                    else:
+                        skipped_count += 1
+                        print(f"No change for {ticker}, skipped write")
                     
                     # 5. Evaluate/Analyze
                     # analyze_stock(data) # OLD simple analysis
@@ -78,36 +137,88 @@ def run_loop(stop_event=None):
                     print(f"  > Performing Deep Analysis for {ticker}...")
                     hist_data = DataFetcher.fetch_historical_data(ticker, period="1y")
                     if hist_data is not None and not hist_data.empty:
+                        cycle_histories[ticker] = hist_data
                         analyzer = StockAnalyzer(hist_data)
                         report = analyzer.evaluate()
-                        print_analysis_report(ticker, report)
+                        handle_report(ticker, report, alert_engine)
                     else:
                         print(f"  > Could not fetch history for deep analysis of {ticker}")
             
-            if stop_event and stop_event.is_set(): break
+            if stop_event and stop_event.is_set():
+                if profiler:
+                    profiler.end_cycle()
+                break
             
-            print(f"--- Cycle complete. Sleeping for {interval} seconds ---")
-            # Sleep in chunks to allow faster stopping
-            for _ in range(int(interval)):
-                if stop_event and stop_event.is_set(): break
-                time.sleep(1)
+            total_count = saved_count + skipped_count
+            if total_count:
+                dedup_ratio = (skipped_count / total_count) * 100
+                print(f"Snapshots: {saved_count} saved, {skipped_count} unchanged (dedup ratio {dedup_ratio:.1f}%)")
+            
+            if config.ENABLE_PORTFOLIO_RISK:
+                watchlist = {s['ShortName'] for s in my_stocks if s.get('ShortName')}
+                risk_model = update_portfolio_risk(risk_model, cycle_histories, risk_histories, watchlist)
+            
+            cycle_elapsed = time.monotonic() - cycle_start
+            if processed_count and cycle_elapsed > 0:
+                print(f"Cycle throughput: {processed_count} tickers in {cycle_elapsed:.2f}s ({processed_count / cycle_elapsed:.1f} tickers/sec)")
+            
+            cycle_stats = scheduler.end_cycle(processed_count, deferred_count)
+            db_manager.record_cycle_metrics(metrics_key, cycle_stats)
+            if cycle_stats['Overrun']:
+                print(f"Cycle overran its {interval}s interval (took {cycle_stats['DurationSeconds']:.1f}s, "
+                      f"{deferred_count} deferred, est. full pass {cycle_stats['EstimatedFullCycleSeconds']}s)")
+            
+            # The profiled window covers the whole cycle (risk update and metrics included), not the sleep
+            if profiler:
+                profiler.end_cycle()
+            
+            sleep_seconds = max(0.0, scheduler.next_start - time.monotonic())
+            print(f"--- Cycle complete. Sleeping for {sleep_seconds:.1f} seconds ---")
+            scheduler.sleep_until_next(stop_event)
             
         except KeyboardInterrupt:
             print("\nStopping application...")
+            if profiler:
+                profiler.end_cycle()
             break
         except Exception as e:
             print(f"An error occurred in the main loop: {e}")
+            if profiler:
+                profiler.end_cycle()
             # Sleep a bit to avoid rapid error loops
             time.sleep(5)
 
+    if alert_engine:
+        alert_engine.close()
+    if coordinator:
+        coordinator.stop()
     db_manager.close()
 
+def run_monitor(engine="sync", stop_event=None, sharded=False, worker_id=None, profiler=None):
+    """Runs the monitoring loop with the selected engine ("sync" or "async")."""
+    if engine == "async":
+        if sharded:
+            print("Sharded mode is only available with the sync engine.")
+            return
+        # Imported lazily: the async engine needs httpx and motor
+        from async_monitor import run_async_engine
+        db_manager = DBManager()
+        alert_engine = build_alert_engine(db_manager) if config.ENABLE_ALERTS else None
+        try:
+            run_async_engine(stop_event, report_callback=lambda ticker, report: handle_report(ticker, report, alert_engine))
+        finally:
+            if alert_engine:
+                alert_engine.close()
+            db_manager.close()
+    else:
+        run_loop(stop_event, sharded=sharded, worker_id=worker_id, profiler=profiler)
+
 def find_stock(identifier):
-    db_manager = DBManager()
+    cache = get_quote_cache()
     print(f"Searching for stock with identifier: '{identifier}'...")
     
     # Try to resolve identifier from DB
-    ticker = db_manager.find_stock_ticker(identifier)
+    ticker = cache.db_manager.find_stock_ticker(identifier)
     
     if ticker:
         print(f"Found in MyStocks: {ticker}")
@@ -116,7 +227,7 @@ def find_stock(identifier):
         ticker = identifier
         
     print(f"Fetching data for: {ticker}")
-    data = DataFetcher.fetch_stock_data(ticker)
+    data = cache.get_quote(ticker)
     
     if data:
         print("\n--- Stock Information ---")
@@ -125,30 +236,90 @@ def find_stock(identifier):
         print("-------------------------")
     else:
         print(f"Could not fetch data for {ticker}")
-        
-    db_manager.close()
 
 def save_stock(identifier):
     print(f"Fetching metadata for '{identifier}'...")
-    info = DataFetcher.fetch_stock_info(identifier)
+    info = get_quote_cache().get_info(identifier)
     
     if info:
         db_manager = DBManager()
         # FullName, ShortName, ISIN, MarketCountry, Currency, MarketType
-        result = db_manager.add_stock(
-            info['FullName'],
-            info['ShortName'],
-            info['ISIN'],
-            info['MarketCountry'],
-            info['Currency'],
-            info['MarketType']
-        )
-        print(f"Successfully added stock: {info['FullName']} ({info['ShortName']})")
+        warn_other_listings(db_manager, [info])
+        inserted, _ = db_manager.upsert_stocks([info])
+        action = "added" if inserted else "updated"
+        print(f"Successfully {action} stock: {info['FullName']} ({info['ShortName']})")
         print(f"Details: ISIN={info['ISIN']}, Country={info['MarketCountry']}, Currency={info['Currency']}, Type={info['MarketType']}")
         db_manager.close()
     else:
         print(f"Could not fetch metadata for '{identifier}'. Please check the ticker symbol.")
 
+def warn_other_listings(db_manager, stocks):
+    """Point out stocks that are another listing of a security already in MyStocks."""
+    for short_name, existing, isin in db_manager.find_other_listings(stocks):
+        print(f"Note: {short_name} shares ISIN {isin} with {existing} already in MyStocks; both are kept.")
+
+def load_identifiers(sources):
+    """
+    Expand save-stocks arguments into a list of identifiers.
+    Each source is either a file (one or more identifiers per line, '#' starts
+    a comment) or an identifier itself; commas separate identifiers in both.
+    """
+    identifiers = []
+    for source in sources:
+        if os.path.isfile(source):
+            with open(source, encoding="utf-8") as f:
+                lines = [line.split('#', 1)[0] for line in f]
+        else:
+            lines = [source]
+        for line in lines:
+            identifiers.extend(token.strip() for token in line.replace(',', ' ').split() if token.strip())
+    # Drop duplicates, keep order
+    return list(dict.fromkeys(identifiers))
+
+def save_stocks(sources):
+    identifiers = load_identifiers(sources)
+    if not identifiers:
+        print("No identifiers to import.")
+        return
+    
+    total = len(identifiers)
+    print(f"Importing {total} identifier(s) with {config.BULK_IMPORT_WORKERS} workers "
+          f"(max {config.BULK_IMPORT_RATE_PER_SECOND} lookups/sec)...")
+    cache = get_quote_cache()
+    # Only cache misses hit Yahoo, so only they are throttled
+    limiter = RateLimiter(config.BULK_IMPORT_RATE_PER_SECOND)
+    
+    db_manager = DBManager()
+    pending = []
+    failures = []
+    inserted_count = 0
+    updated_count = 0
+    
+    with ThreadPoolExecutor(max_workers=config.BULK_IMPORT_WORKERS) as pool:
+        futures = {pool.submit(cache.get_info, identifier, limiter): identifier for identifier in identifiers}
+        for done, future in enumerate(as_completed(futures), start=1):
+            identifier = futures[future]
+            info = future.result()
+            if info:
+                pending.append(info)
+                print(f"[{done}/{total}] {identifier} -> {info['ShortName']} ({info['FullName']})")
+            else:
+                failures.append(identifier)
+                print(f"[{done}/{total}] {identifier} -> FAILED")
+            
+            # Flush in batches so progress survives an interrupted import
+            if len(pending) >= config.BULK_IMPORT_BATCH_SIZE or (done == total and pending):
+                warn_other_listings(db_manager, pending)
+                inserted, updated = db_manager.upsert_stocks(pending)
+                inserted_count += inserted
+                updated_count += updated
+                pending = []
+    
+    db_manager.close()
+    print(f"Import complete: {inserted_count} added, {updated_count} updated, {len(failures)} failed.")
+    if failures:
+        print(f"Failed identifiers: {', '.join(failures)}")
+
 def print_analysis_report(ticker, report):
     print("\n" + "="*40)
     print(f"REPORT: {ticker}")
@@ -178,6 +349,118 @@ def print_analysis_report(ticker, report):
     print(f"  Max Drawdown: {q['Max_Drawdown_Percent']}%")
     print("="*40 + "\n")
 
+def handle_report(ticker, report, alert_engine=None):
+    """
+    Print the analysis of a monitoring cycle. With alerting enabled the full
+    report is only printed the first time and when signals change state.
+    """
+    if alert_engine is None:
+        print_analysis_report(ticker, report)
+        return
+    
+    first_report = not alert_engine.has_baseline(ticker)
+    alerts = alert_engine.update(ticker, report)
+    if first_report or alerts or report['Status'] == "INSUFFICIENT_DATA":
+        print_analysis_report(ticker, report)
+    else:
+        print(f"  > No signal changes for {ticker} ({report['Status']})")
+    for alert in alerts:
+        print(f"  ! ALERT {ticker}: {alert['Message']}")
+
+def update_portfolio_risk(risk_model, histories, known_histories, watchlist):
+    """
+    Seed the portfolio risk model, then only feed it the latest daily bar of
+    the tickers fetched in this cycle; the others (failed or deferred) keep
+    their last price.
+    known_histories keeps the last good history per ticker across cycles. The
+    model is only rebuilt (from it) when the watchlist gains or loses a ticker.
+
+    Args:
+        watchlist (set): tickers this process monitors (its owned partition when sharded).
+    """
+    for ticker in set(known_histories) - set(watchlist):
+        del known_histories[ticker]
+    known_histories.update(histories)
+    benchmark = config.RISK_BENCHMARK_TICKER
+    tickers = set(known_histories) - {benchmark}
+    if not tickers:
+        return None
+    rebuild = risk_model is None or set(risk_model.tickers) != tickers
+    if not rebuild and not tickers & set(histories):
+        return risk_model
+    
+    try:
+        if rebuild:
+            seed_histories = dict(known_histories)
+            bench_hist = DataFetcher.fetch_historical_data(benchmark, period=config.RISK_HISTORY_PERIOD)
+            if bench_hist is not None:
+                seed_histories[benchmark] = bench_hist
+            risk_model = PortfolioRisk.from_histories(seed_histories, benchmark=benchmark)
+        else:
+            # yfinance can return NaN closes (e.g. for the running session)
+            closes = {ticker: close_series(hist).dropna() for ticker, hist in histories.items() if ticker in tickers}
+            if risk_model.benchmark:
+                bench_hist = DataFetcher.fetch_historical_data(benchmark, period="5d")
+                if bench_hist is not None:
+                    closes[benchmark] = close_series(bench_hist).dropna()
+            closes = {ticker: series for ticker, series in closes.items() if not series.empty}
+            if not closes:
+                return risk_model
+            last_date = max(series.index[-1] for series in closes.values())
+            risk_model.update(last_date, {ticker: float(series.iloc[-1]) for ticker, series in closes.items()})
+    except ValueError as e:
+        print(f"Could not compute portfolio risk: {e}")
+        return None
+    
+    p = risk_model.report()["Portfolio"]
+    print(f"Portfolio risk ({len(risk_model.tickers)} tickers): Volatility {p['Volatility_Percent']}% | "
+          f"Drawdown {p['Drawdown_Percent']}% (max {p['Max_Drawdown_Percent']}%)")
+    return risk_model
+
+def print_risk_report(report):
+    print("\n" + "="*40)
+    print("PORTFOLIO RISK")
+    print("="*40)
+    print(f"As of: {report['Date']} | Window: {report['Window']} days | Benchmark: {report['Benchmark'] or 'N/A'}")
+    print("-" * 40)
+    p = report['Portfolio']
+    print(f"PORTFOLIO (equal weight):")
+    print(f"  Volatility (annualised): {p['Volatility_Percent']}%")
+    print(f"  Drawdown: {p['Drawdown_Percent']}% (max {p['Max_Drawdown_Percent']}%)")
+    print(f"TICKERS:")
+    for ticker, t in report['Tickers'].items():
+        beta = t['Beta'] if t['Beta'] is not None else 'N/A'
+        print(f"  {ticker}: Volatility {t['Volatility_Percent']}% | Beta {beta}")
+    print(f"CORRELATION:")
+    print(report['Correlation'].to_string())
+    print("="*40 + "\n")
+
+def portfolio_risk():
+    db_manager = DBManager()
+    tickers = [s.get('ShortName') for s in db_manager.get_my_stocks() if s.get('ShortName')]
+    db_manager.close()
+    if not tickers:
+        print("No stocks in MyStocks. Please add stocks to the database.")
+        return
+    
+    benchmark = config.RISK_BENCHMARK_TICKER
+    print(f"Fetching {config.RISK_HISTORY_PERIOD} history for {len(tickers)} stocks and benchmark {benchmark}...")
+    histories = {}
+    for ticker in dict.fromkeys(tickers + [benchmark]):
+        hist = DataFetcher.fetch_historical_data(ticker, period=config.RISK_HISTORY_PERIOD)
+        if hist is not None and not hist.empty:
+            histories[ticker] = hist
+    if not set(histories) - {benchmark}:
+        print("Could not fetch history for any stock.")
+        return
+    
+    try:
+        risk_model = PortfolioRisk.from_histories(histories, benchmark=benchmark)
+    except ValueError as e:
+        print(f"Could not compute portfolio risk: {e}")
+        return
+    print_risk_report(risk_model.report())
+
 def analyze_stock_detailed(identifier):
     print(f"Fetching 1 year historical data for '{identifier}'...")
     # 1. Resolve identifier to ticker if needed (reuse find logic or just assume ticker)
@@ -203,19 +486,28 @@ class StockShell(cmd.Cmd):
     def __init__(self):
         super().__init__()
         self.monitor_thread = None
+        self.monitor_engine = None
         self.stop_event = threading.Event()
+        self.profiler = CycleProfiler()
 
     def do_monitor(self, arg):
-        'Control background monitoring: monitor start | monitor stop'
-        if arg == 'start':
-            if self.monitor_thread and self.monitor_thread.is_alive():
+        'Control background monitoring: monitor start [sync|async] | monitor stop'
+        args = arg.split()
+        action = args[0] if args else ''
+        if action == 'start':
+            engine = args[1] if len(args) > 1 else 'sync'
+            if engine not in ENGINES:
+                print(f"Unknown engine '{engine}'. Choose from: {', '.join(ENGINES)}")
+            elif self.monitor_thread and self.monitor_thread.is_alive():
                 print("Monitoring is already running.")
             else:
                 self.stop_event.clear()
-                self.monitor_thread = threading.Thread(target=run_loop, args=(self.stop_event,), daemon=True)
+                self.monitor_engine = engine
+                self.monitor_thread = threading.Thread(target=run_monitor, args=(engine, self.stop_event),
+                                                       kwargs={"profiler": self.profiler}, daemon=True)
                 self.monitor_thread.start()
-                print("Monitoring loop started in background.")
-        elif arg == 'stop':
+                print(f"Monitoring loop started in background ({engine} engine).")
+        elif action == 'stop':
             if self.monitor_thread and self.monitor_thread.is_alive():
                 print("Stopping monitoring loop... (may take up to 1 second)")
                 self.stop_event.set()
@@ -224,7 +516,32 @@ class StockShell(cmd.Cmd):
             else:
                 print("Monitoring is not running.")
         else:
-            print("Usage: monitor <start|stop>")
+            print("Usage: monitor <start [sync|async]|stop>")
+
+    def do_profile(self, arg):
+        'Profile monitoring cycles: profile start [cycles] [sample_ms] | profile stop | profile dump'
+        args = arg.split()
+        action = args[0] if args else ''
+        if action == 'start':
+            if not (self.monitor_thread and self.monitor_thread.is_alive()):
+                print("Monitoring is not running. Start it with 'monitor start'.")
+                return
+            if self.monitor_engine != 'sync':
+                print("Profiling is only available with the sync engine.")
+                return
+            try:
+                cycles = int(args[1]) if len(args) > 1 else 1
+                sample_interval = int(args[2]) / 1000 if len(args) > 2 else None
+            except ValueError:
+                print("Usage: profile start [cycles] [sample_ms]")
+                return
+            self.profiler.start(cycles, sample_interval)
+        elif action == 'stop':
+            self.profiler.stop()
+        elif action == 'dump':
+            self.profiler.dump()
+        else:
+            print("Usage: profile <start [cycles] [sample_ms]|stop|dump>")
 
     def do_find(self, arg):
         'Find stock info: find <identifier>'
@@ -240,6 +557,13 @@ class StockShell(cmd.Cmd):
             return
         save_stock(arg)
 
+    def do_save_stocks(self, arg):
+        'Save many stocks at once: save_stocks <ticker|ISIN|file> [...]'
+        if not arg:
+            print("Usage: save_stocks <ticker|ISIN|file> [...]")
+            return
+        save_stocks(arg.split())
+
     def do_analyze(self, arg):
         'Analyze stock (Bull/Bear): analyze <identifier>'
         if not arg:
@@ -247,6 +571,10 @@ class StockShell(cmd.Cmd):
             return
         analyze_stock_detailed(arg)
 
+    def do_risk(self, arg):
+        'Portfolio risk across MyStocks (volatility, beta, correlation, drawdown): risk'
+        portfolio_risk()
+
     def do_exit(self, arg):
         'Exit the shell'
         print("Exiting...")
@@ -264,7 +592,10 @@ def main():
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
     # 'run' command
-    subparsers.add_parser("run", help="Run the continuous monitoring loop (CLI mode)")
+    run_parser = subparsers.add_parser("run", help="Run the continuous monitoring loop (CLI mode)")
+    run_parser.add_argument("--engine", choices=ENGINES, default="sync", help="Monitoring engine (default: sync)")
+    run_parser.add_argument("--sharded", action="store_true", help="Share the watchlist with other workers on the same MongoDB")
+    run_parser.add_argument("--worker-id", help="Worker name in sharded mode (default: <hostname>-<pid>)")
     
     # 'find-stock' command
     find_parser = subparsers.add_parser("find-stock", help="Find and display stock info")
@@ -274,10 +605,17 @@ def main():
     save_parser = subparsers.add_parser("save-stock", help="Add a new stock to MyStocks")
     save_parser.add_argument("identifier", help="Ticker Symbol (e.g. AAPL, RACE.MI)")
 
+    # 'save-stocks' command
+    save_many_parser = subparsers.add_parser("save-stocks", help="Add many stocks to MyStocks (bulk import)")
+    save_many_parser.add_argument("sources", nargs="+", help="Ticker Symbols, ISINs, or files listing them")
+
     # 'analyze-stock' command
     analyze_parser = subparsers.add_parser("analyze-stock", help="Perform deep technical analysis (Bull/Bear)")
     analyze_parser.add_argument("identifier", help="Stock Name, Short Name, or ISIN")
 
+    # 'risk' command
+    subparsers.add_parser("risk", help="Portfolio risk across MyStocks (volatility, beta, correlation, drawdown)")
+
     # 'interactive' command
     subparsers.add_parser("interactive", help="Start interactive shell mode")
 
@@ -290,13 +628,17 @@ def main():
     else:
         args = parser.parse_args()
         if args.command == "run":
-            run_loop()
+            run_monitor(args.engine, sharded=args.sharded, worker_id=args.worker_id)
         elif args.command == "find-stock":
             find_stock(args.identifier)
         elif args.command == "save-stock":
             save_stock(args.identifier)
+        elif args.command == "save-stocks":
+            save_stocks(args.sources)
         elif args.command == "analyze-stock":
             analyze_stock_detailed(args.identifier)
+        elif args.command == "risk":
+            portfolio_risk()
         elif args.command == "interactive":
             StockShell().cmdloop()
         elif args.command == "help":
@@ -0,0 +1,171 @@
+import cProfile
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+import config
+
+class CycleProfiler:
+    """
+    Profiles the next N monitoring cycles of a running run_loop.
+
+    The shell thread arms the profiler; the monitor thread calls begin_cycle()
+    and end_cycle() around each cycle, so cProfile is enabled on the monitor
+    thread itself and only while a cycle is running (not while sleeping).
+    tracemalloc follows the same window, and an optional sampler thread records
+    the monitor thread's stack every `sample_interval` seconds in folded format
+    (flamegraph.pl / speedscope compatible).
+    When not armed, begin_cycle() and end_cycle() return immediately.
+    """
+
+    def __init__(self, output_dir=config.PROFILE_OUTPUT_DIR):
+        self.output_dir = output_dir
+        self.armed = False
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._profile = None
+        self._cycles_remaining = 0
+        self._cycles_done = 0
+        self._in_cycle = False
+        self._stop_requested = False
+        self._dump_requested = False
+        self._sample_interval = None
+        self._sampler = None
+        self._sampler_stop = threading.Event()
+        self._samples = Counter()
+        # Not self._lock: _finish joins the sampler while holding it
+        self._samples_lock = threading.Lock()
+        self._target_thread_id = None
+        self._owns_tracemalloc = False
+
+    def start(self, cycles=1, sample_interval=None):
+        """Arm the profiler for the next `cycles` cycles."""
+        with self._lock:
+            if self.armed:
+                print("Profiler is already running.")
+                return
+            self._reset()
+            self._cycles_remaining = cycles
+            self._sample_interval = sample_interval
+            self.armed = True
+        print(f"Profiling the next {cycles} cycle(s)" +
+              (f" with stack sampling every {sample_interval * 1000:.0f}ms." if sample_interval else "."))
+
+    def stop(self):
+        """Stop profiling and write the results (at the end of the running cycle, if any)."""
+        with self._lock:
+            if not self.armed:
+                print("Profiler is not running.")
+                return
+            if self._in_cycle:
+                self._stop_requested = True
+                print("Profiler will stop at the end of the current cycle.")
+                return
+            self._finish()
+
+    def dump(self):
+        """Write the results collected so far without stopping."""
+        with self._lock:
+            if not self.armed:
+                print("Profiler is not running.")
+                return
+            if self._in_cycle:
+                self._dump_requested = True
+                print("Profile will be dumped at the end of the current cycle.")
+                return
+            if self._profile is None:
+                print("No cycle profiled yet.")
+                return
+            self._write()
+
+    def begin_cycle(self):
+        """Called by the monitor thread at the start of a cycle."""
+        if not self.armed:
+            return
+        with self._lock:
+            # 'profile stop' may have disarmed it since the check above
+            if not self.armed:
+                return
+            if self._profile is None:
+                self._profile = cProfile.Profile()
+                self._target_thread_id = threading.get_ident()
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+                    self._owns_tracemalloc = True
+                if self._sample_interval:
+                    self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+                    self._sampler.start()
+            self._in_cycle = True
+        self._profile.enable()
+
+    def end_cycle(self):
+        """Called by the monitor thread at the end of a cycle."""
+        if not self.armed or not self._in_cycle:
+            return
+        self._profile.disable()
+        with self._lock:
+            self._in_cycle = False
+            self._cycles_done += 1
+            self._cycles_remaining -= 1
+            if self._cycles_remaining <= 0 or self._stop_requested:
+                self._finish()
+            elif self._dump_requested:
+                self._dump_requested = False
+                self._write()
+
+    def _sample_loop(self):
+        while not self._sampler_stop.wait(self._sample_interval):
+            if not self._in_cycle:
+                continue
+            frame = sys._current_frames().get(self._target_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                with self._samples_lock:
+                    self._samples[";".join(reversed(stack))] += 1
+
+    def _write(self):
+        """Write pstats, tracemalloc snapshot and folded stacks. Caller holds the lock."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"cycle-profile-{datetime.now():%Y%m%d-%H%M%S}")
+
+        self._profile.dump_stats(f"{base}.pstats")
+        written = [f"{base}.pstats"]
+
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            snapshot.dump(f"{base}.tracemalloc")
+            written.append(f"{base}.tracemalloc")
+            print("Top allocations:")
+            for stat in snapshot.statistics("lineno")[:5]:
+                print(f"  {stat}")
+
+        with self._samples_lock:
+            samples = dict(self._samples)
+        if samples:
+            with open(f"{base}.folded", "w", encoding="utf-8") as f:
+                for stack, count in samples.items():
+                    f.write(f"{stack} {count}\n")
+            written.append(f"{base}.folded")
+
+        print(f"Profile of {self._cycles_done} cycle(s) written to: {', '.join(written)}")
+
+    def _finish(self):
+        """Write the results and disarm. Caller holds the lock."""
+        self._sampler_stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._profile is not None:
+            self._write()
+        else:
+            print("No cycle was profiled.")
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        self.armed = False
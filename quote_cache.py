@@ -0,0 +1,174 @@
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+import config
+from data_fetcher import DataFetcher
+from db_manager import DBManager
+
+class QuoteCache:
+    """
+    Two-level cache (in-process LRU + QuoteCache collection) in front of DataFetcher.
+
+    Quotes and metadata have their own TTL. Once an entry is older than its TTL
+    but still within the stale window it is returned immediately while a
+    background refresh runs (stale-while-revalidate). Concurrent callers asking
+    for the same key share one in-flight fetch.
+
+    Background refreshes run on daemon threads: a one-shot CLI command exits
+    as soon as it is done, dropping the refreshes still pending.
+    """
+
+    REFRESH_WORKERS = 4
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.collection = db_manager.db[config.COLLECTION_QUOTE_CACHE]
+        self.collection.create_index("ExpireAt", expireAfterSeconds=0)
+        # kind -> (fetch function, ttl seconds, stale window seconds)
+        self.kinds = {
+            "quote": (DataFetcher.fetch_stock_data,
+                      config.QUOTE_CACHE_TTL_SECONDS,
+                      config.QUOTE_CACHE_STALE_SECONDS),
+            "info": (DataFetcher.fetch_stock_info,
+                     config.METADATA_CACHE_TTL_DAYS * 86400,
+                     config.METADATA_CACHE_STALE_DAYS * 86400),
+        }
+        self._lru = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._refresh_queue = queue.Queue()
+        self._refresh_workers = []
+
+    def get_quote(self, ticker_symbol, rate_limiter=None):
+        """Cached DataFetcher.fetch_stock_data."""
+        return self._get("quote", ticker_symbol, rate_limiter)
+
+    def get_info(self, ticker_symbol, rate_limiter=None):
+        """
+        Cached DataFetcher.fetch_stock_info.
+
+        Args:
+            rate_limiter (RateLimiter, optional): throttles the fetches to Yahoo only;
+                cache hits are returned without taking a token.
+        """
+        return self._get("info", ticker_symbol, rate_limiter)
+
+    def _get(self, kind, ticker_symbol, rate_limiter=None):
+        key = f"{kind}:{ticker_symbol.upper()}"
+        _, ttl, stale = self.kinds[kind]
+
+        entry = self._lookup(key)
+        if entry:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < ttl:
+                return dict(value)
+            if age < ttl + stale:
+                self._refresh(kind, key, ticker_symbol, rate_limiter, background=True)
+                return dict(value)
+
+        value = self._refresh(kind, key, ticker_symbol, rate_limiter).result()
+        return dict(value) if value is not None else None
+
+    def _lookup(self, key):
+        """(value, fetched_at) from the LRU, falling back to MongoDB."""
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry:
+                self._lru.move_to_end(key)
+                return entry
+
+        doc = self.collection.find_one({"_id": key})
+        if not doc:
+            return None
+        entry = (doc["Value"], doc["FetchedAt"])
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._lru[key] = entry
+            self._lru.move_to_end(key)
+            while len(self._lru) > config.CACHE_LRU_SIZE:
+                self._lru.popitem(last=False)
+
+    def _refresh(self, kind, key, ticker_symbol, rate_limiter=None, background=False):
+        """
+        Start (or join) the fetch of a key.
+
+        Returns:
+            concurrent.futures.Future resolving to the fetched value (None if the fetch failed).
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future:
+                return future
+            future = Future()
+            self._inflight[key] = future
+
+        if background:
+            self._refresh_queue.put((kind, key, ticker_symbol, future, rate_limiter))
+            self._start_refresh_worker()
+        else:
+            self._load(kind, key, ticker_symbol, future, rate_limiter)
+        return future
+
+    def _start_refresh_worker(self):
+        """Start another refresh thread, up to REFRESH_WORKERS."""
+        with self._lock:
+            if len(self._refresh_workers) >= self.REFRESH_WORKERS:
+                return
+            worker = threading.Thread(
+                target=self._refresh_loop,
+                name=f"cache-refresh-{len(self._refresh_workers)}",
+                daemon=True
+            )
+            self._refresh_workers.append(worker)
+        worker.start()
+
+    def _refresh_loop(self):
+        while True:
+            self._load(*self._refresh_queue.get())
+
+    def _load(self, kind, key, ticker_symbol, future, rate_limiter=None):
+        fetch, ttl, stale = self.kinds[kind]
+        value = None
+        try:
+            if rate_limiter:
+                rate_limiter.acquire()
+            value = fetch(ticker_symbol)
+            # Failed lookups are not cached, the next call retries
+            if value is not None:
+                fetched_at = time.time()
+                self._remember(key, (value, fetched_at))
+                self.collection.replace_one(
+                    {"_id": key},
+                    {
+                        "Kind": kind,
+                        "Ticker": ticker_symbol.upper(),
+                        "Value": value,
+                        "FetchedAt": fetched_at,
+                        "ExpireAt": datetime.now(timezone.utc) + timedelta(seconds=ttl + stale),
+                    },
+                    upsert=True
+                )
+        except Exception as e:
+            print(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_result(value)
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_quote_cache():
+    """Process-wide QuoteCache, so the LRU survives across shell commands."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = QuoteCache(DBManager())
+        return _default_cache
@@ -0,0 +1,194 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+import config
+
+TRADING_DAYS = 252
+
+def close_series(data):
+    """'Close' column of a yfinance history frame as a Series (handles MultiIndex columns)."""
+    col = data['Close']
+    if isinstance(col, pd.DataFrame):
+        return col.iloc[:, 0]
+    return col
+
+class PortfolioRisk:
+    """
+    Cross-sectional risk of a set of tickers over a rolling window of daily returns.
+
+    The window is kept as running sums (sum of returns and sum of outer
+    products), so adding a bar costs O(n^2) for n tickers instead of
+    rebuilding the covariance from the full returns matrix every cycle.
+    The portfolio is equally weighted; the benchmark (if any) is tracked
+    as an extra column for beta but is not part of the portfolio.
+    The last bar may be today's unfinished session: updating with the same
+    date replaces it instead of being ignored.
+    """
+
+    def __init__(self, closes, benchmark=None, window=config.RISK_WINDOW_DAYS):
+        """
+        Args:
+            closes (pandas.DataFrame): close prices, one column per ticker (benchmark included).
+            benchmark (str): column of `closes` to compute betas against.
+            window (int): number of daily returns in the rolling window.
+        """
+        prices = closes.sort_index().ffill().dropna()
+        if len(prices) < 3:
+            raise ValueError("Not enough overlapping history to compute risk metrics")
+
+        self.columns = list(prices.columns)
+        self.benchmark = benchmark if benchmark in self.columns else None
+        self.tickers = [c for c in self.columns if c != self.benchmark]
+        self._portfolio_idx = np.array([self.columns.index(t) for t in self.tickers])
+        self.window = window
+
+        returns = prices.pct_change().iloc[1:].to_numpy()
+        self._rows = deque(maxlen=window)
+        self._sum = np.zeros(len(self.columns))
+        self._sum_outer = np.zeros((len(self.columns), len(self.columns)))
+        for row in returns[-window:]:
+            evicted = self._push(row)
+
+        self.last_prices = prices.iloc[-1].to_numpy()
+        self.last_date = prices.index[-1]
+
+        # Equal-weighted portfolio equity curve, starting at 1.0
+        equity = np.cumprod(1 + returns[:, self._portfolio_idx].mean(axis=1))
+        peaks = np.maximum.accumulate(np.maximum(equity, 1.0))
+        drawdowns = np.minimum(equity / peaks - 1, 0.0)
+        self.equity = float(equity[-1])
+        self.peak = float(peaks[-1])
+        self.max_drawdown = float(drawdowns.min())
+
+        # State before the last bar, so that bar can be replaced (see update)
+        self._undo = (
+            prices.iloc[-2].to_numpy(),
+            float(equity[-2]) if len(equity) > 1 else 1.0,
+            float(peaks[-2]) if len(peaks) > 1 else 1.0,
+            float(drawdowns[:-1].min()) if len(drawdowns) > 1 else 0.0,
+            evicted,
+        )
+
+    @classmethod
+    def from_histories(cls, histories, benchmark=None, window=config.RISK_WINDOW_DAYS):
+        """Build from a dict of ticker -> yfinance history frame."""
+        closes = pd.concat({ticker: close_series(hist) for ticker, hist in histories.items()}, axis=1)
+        return cls(closes, benchmark=benchmark, window=window)
+
+    def _push(self, row):
+        """Append a returns row to the window; returns the row evicted from it (or None)."""
+        evicted = None
+        if len(self._rows) == self._rows.maxlen:
+            evicted = self._rows[0]
+            self._sum -= evicted
+            self._sum_outer -= np.outer(evicted, evicted)
+        self._rows.append(row)
+        self._sum += row
+        self._sum_outer += np.outer(row, row)
+        return evicted
+
+    def _pop(self, evicted):
+        """Undo the last _push."""
+        row = self._rows.pop()
+        self._sum -= row
+        self._sum_outer -= np.outer(row, row)
+        if evicted is not None:
+            self._rows.appendleft(evicted)
+            self._sum += evicted
+            self._sum_outer += np.outer(evicted, evicted)
+
+    def update(self, date, prices):
+        """
+        Add a daily bar, or replace the last one if it has the same date
+        (the session was still open when it was recorded).
+
+        Args:
+            date: date of the bar; bars older than the last one are ignored.
+            prices (dict): ticker -> close. Missing tickers and non-finite closes keep their last price.
+
+        Returns:
+            bool: True if the bar was added or replaced.
+        """
+        if date < self.last_date:
+            return False
+
+        # Tickers without a new price (failed or deferred fetch, NaN close) are carried
+        # forward: a NaN would stay in the running sums for good
+        new_prices = np.array([prices.get(c, np.nan) for c in self.columns], dtype=float)
+        new_prices = np.where(np.isfinite(new_prices), new_prices, self.last_prices)
+        if date == self.last_date:
+            prev_prices, self.equity, self.peak, self.max_drawdown, evicted = self._undo
+            self._pop(evicted)
+            self.last_prices = prev_prices
+
+        row = new_prices / self.last_prices - 1
+        self._undo = (self.last_prices, self.equity, self.peak, self.max_drawdown, None)
+        evicted = self._push(row)
+        self._undo = self._undo[:4] + (evicted,)
+        self.last_prices = new_prices
+        self.last_date = date
+
+        self.equity *= 1 + float(row[self._portfolio_idx].mean())
+        self.peak = max(self.peak, self.equity)
+        self.max_drawdown = min(self.max_drawdown, self.equity / self.peak - 1)
+        return True
+
+    def covariance(self):
+        """Covariance matrix of daily returns over the window (pandas.DataFrame)."""
+        n = len(self._rows)
+        mean = self._sum / n
+        cov = (self._sum_outer - n * np.outer(mean, mean)) / (n - 1)
+        return pd.DataFrame(cov, index=self.columns, columns=self.columns)
+
+    def correlation(self):
+        """Correlation matrix of daily returns over the window (pandas.DataFrame)."""
+        cov = self.covariance()
+        std = np.sqrt(np.diag(cov.to_numpy()))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov.to_numpy() / np.outer(std, std)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def volatility(self):
+        """Annualised volatility per ticker (pandas.Series, fraction)."""
+        cov = self.covariance().to_numpy()
+        return pd.Series(np.sqrt(np.diag(cov) * TRADING_DAYS), index=self.columns)
+
+    def portfolio_volatility(self):
+        """Annualised volatility of the equal-weighted portfolio (fraction)."""
+        cov = self.covariance().to_numpy()[np.ix_(self._portfolio_idx, self._portfolio_idx)]
+        weights = np.full(len(self._portfolio_idx), 1 / len(self._portfolio_idx))
+        return float(np.sqrt(weights @ cov @ weights * TRADING_DAYS))
+
+    def betas(self):
+        """Beta of each ticker against the benchmark (pandas.Series), empty without benchmark."""
+        if self.benchmark is None:
+            return pd.Series(dtype=float)
+        cov = self.covariance()
+        return cov.loc[self.tickers, self.benchmark] / cov.loc[self.benchmark, self.benchmark]
+
+    def drawdown(self):
+        """Current drawdown of the portfolio from its peak (fraction, <= 0)."""
+        return self.equity / self.peak - 1
+
+    def report(self):
+        """Summary dict, in the style of StockAnalyzer.evaluate."""
+        vol = self.volatility()
+        betas = self.betas()
+        return {
+            "Date": self.last_date,
+            "Window": len(self._rows),
+            "Benchmark": self.benchmark,
+            "Portfolio": {
+                "Volatility_Percent": round(self.portfolio_volatility() * 100, 2),
+                "Drawdown_Percent": round(self.drawdown() * 100, 2),
+                "Max_Drawdown_Percent": round(self.max_drawdown * 100, 2),
+            },
+            "Tickers": {
+                ticker: {
+                    "Volatility_Percent": round(float(vol[ticker]) * 100, 2),
+                    "Beta": round(float(betas[ticker]), 2) if ticker in betas else None,
+                }
+                for ticker in self.tickers
+            },
+            "Correlation": self.correlation().loc[self.tickers, self.tickers].round(2),
+        }
@@ -0,0 +1,154 @@
+import bisect
+import hashlib
+import os
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+import pymongo
+from pymongo.errors import DuplicateKeyError
+import config
+
+def _hash(key):
+    """Stable 64-bit hash of a string (identical on every worker/node)."""
+    return int(hashlib.md5(key.encode("utf-8")).hexdigest()[:16], 16)
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+class ShardCoordinator:
+    """
+    Splits the MyStocks watchlist across monitoring workers sharing one MongoDB.
+
+    Every worker keeps a heartbeat lease in the Workers collection. The live
+    workers are placed on a consistent hash ring (config.SHARD_VIRTUAL_NODES
+    points each) and a ticker belongs to the first worker clockwise from the
+    hash of its ShortName, so a join/leave only moves the tickers of the
+    affected ring segments. Ownership is advisory: before polling, a worker
+    also claims a per-interval lease in TickerLeases, which is atomic and
+    therefore guarantees a ticker is polled at most once per interval even
+    while workers disagree about the ring during a rebalance.
+    """
+
+    def __init__(self, db_manager, worker_id=None):
+        self.db = db_manager.db
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.workers = []
+        self._ring_hashes = []
+        self._ring_owners = []
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread = None
+        self._init_collections()
+
+    def _init_collections(self):
+        # TTL indexes let MongoDB purge leases of dead workers on its own
+        self.db[config.COLLECTION_WORKERS].create_index("LeaseExpiresAt", expireAfterSeconds=0)
+        self.db[config.COLLECTION_TICKER_LEASES].create_index("LeaseExpiresAt", expireAfterSeconds=0)
+
+    def start(self):
+        """Register this worker and keep its lease alive from a background thread."""
+        self.heartbeat()
+        self._heartbeat_stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        self._heartbeat_thread.start()
+        print(f"Worker {self.worker_id} registered for sharded monitoring.")
+
+    def stop(self):
+        """Stop heartbeating and deregister, so the other workers take over immediately."""
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=2)
+        self.db[config.COLLECTION_WORKERS].delete_one({"_id": self.worker_id})
+        print(f"Worker {self.worker_id} deregistered.")
+
+    def heartbeat(self):
+        now = _utcnow()
+        self.db[config.COLLECTION_WORKERS].update_one(
+            {"_id": self.worker_id},
+            {
+                "$set": {
+                    "Host": socket.gethostname(),
+                    "Pid": os.getpid(),
+                    "LastHeartbeat": now,
+                    "LeaseExpiresAt": now + timedelta(seconds=config.WORKER_LEASE_TTL_SECONDS),
+                },
+                "$setOnInsert": {"StartedAt": now},
+            },
+            upsert=True
+        )
+
+    def _heartbeat_loop(self):
+        period = config.WORKER_LEASE_TTL_SECONDS / 3
+        while not self._heartbeat_stop.wait(period):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                print(f"Worker heartbeat failed: {e}")
+
+    def refresh(self):
+        """
+        Reload the live workers and rebuild the hash ring if membership changed.
+
+        Returns:
+            bool: True if the ring was rebuilt (tickers may have moved).
+        """
+        live = self.db[config.COLLECTION_WORKERS].find(
+            {"LeaseExpiresAt": {"$gt": _utcnow()}},
+            projection={"_id": 1}
+        ).sort("_id", pymongo.ASCENDING)
+        workers = [doc["_id"] for doc in live]
+        if self.worker_id not in workers:
+            # Our lease lapsed (e.g. a long GC pause); rejoin before claiming work
+            self.heartbeat()
+            workers = sorted(workers + [self.worker_id])
+
+        if workers != self.workers:
+            print(f"Rebalancing shards: {len(workers)} live worker(s) {workers}")
+            points = sorted(
+                (_hash(f"{worker}#{i}"), worker)
+                for worker in workers
+                for i in range(config.SHARD_VIRTUAL_NODES)
+            )
+            self._ring_hashes = [point[0] for point in points]
+            self._ring_owners = [point[1] for point in points]
+            self.workers = workers
+            return True
+        return False
+
+    def owner_of(self, ticker):
+        """Worker responsible for a ticker according to the current ring."""
+        if not self._ring_hashes:
+            return self.worker_id
+        idx = bisect.bisect(self._ring_hashes, _hash(ticker)) % len(self._ring_hashes)
+        return self._ring_owners[idx]
+
+    def owns(self, ticker):
+        return self.owner_of(ticker) == self.worker_id
+
+    def claim_ticker(self, ticker, interval):
+        """
+        Atomically claim the right to poll a ticker for the next `interval` seconds.
+        The current owner may always renew its own lease.
+
+        Returns:
+            bool: True if this worker may poll the ticker now.
+        """
+        now = _utcnow()
+        try:
+            # Matches an expired lease or our own (cycles run on an `interval` grid,
+            # so our previous lease may not have expired yet); otherwise the upsert
+            # collides on _id
+            self.db[config.COLLECTION_TICKER_LEASES].update_one(
+                {"_id": ticker, "$or": [
+                    {"LeaseExpiresAt": {"$lte": now}},
+                    {"Owner": self.worker_id},
+                ]},
+                {"$set": {
+                    "Owner": self.worker_id,
+                    "ClaimedAt": now,
+                    "LeaseExpiresAt": now + timedelta(seconds=interval),
+                }},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
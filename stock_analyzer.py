@@ -1,15 +1,22 @@
 
 import pandas as pd
 import numpy as np
+import config
+from indicator_kernels import get_kernels
 
 class StockAnalyzer:
-    def __init__(self, data):
+    def __init__(self, data, backend=None):
         """
         Initialize with historical data.
         Args:
             data (pandas.DataFrame): Historical stock data (must contain 'Close' column).
+            backend (str): Indicator backend ("pandas", "numpy" or "numba"), default config.INDICATOR_BACKEND.
+                Series with missing (NaN) closes always use pandas.
         """
         self.data = data
+        self.backend = backend or config.INDICATOR_BACKEND
+        self.kernels = get_kernels(self.backend)
+        self._close_values = None
         self._ensure_data_validity()
 
     def _ensure_data_validity(self):
@@ -50,11 +57,32 @@ class StockAnalyzer:
         except KeyError:
              raise ValueError(f"Column {column_name} not found in data")
 
+    def _close_array(self):
+        """Close prices as a float64 NumPy array (for the kernel backends)."""
+        if self._close_values is None:
+            self._close_values = self._get_series('Close').to_numpy(dtype=np.float64)
+        return self._close_values
+
+    def _use_kernels(self):
+        """
+        Kernels assume finite prices; a NaN close (e.g. a missing bar from yfinance)
+        would propagate through cumsum/EMA/cummax, so such series use the pandas path.
+        """
+        return self.kernels is not None and bool(np.isfinite(self._close_array()).all())
+
+    def _as_series(self, values):
+        """Wrap a kernel result with the index of the Close series."""
+        return pd.Series(values, index=self._get_series('Close').index)
+
     def calculate_sma(self, period):
+        if self._use_kernels():
+            return self._as_series(self.kernels.sma(self._close_array(), period))
         series = self._get_series('Close')
         return series.rolling(window=period).mean()
 
     def calculate_rsi(self, period=14):
+        if self._use_kernels():
+            return self._as_series(self.kernels.rsi(self._close_array(), period))
         series = self._get_series('Close')
         delta = series.diff()
         gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
@@ -65,6 +93,8 @@ class StockAnalyzer:
         return rsi
 
     def calculate_macd(self, fast=12, slow=26, signal=9):
+        if self._use_kernels():
+            return tuple(self._as_series(v) for v in self.kernels.macd(self._close_array(), fast, slow, signal))
         series = self._get_series('Close')
         exp1 = series.ewm(span=fast, adjust=False).mean()
         exp2 = series.ewm(span=slow, adjust=False).mean()
@@ -74,6 +104,11 @@ class StockAnalyzer:
         return macd_line, signal_line, histogram
 
     def calculate_bollinger_bands(self, period=20, std_dev=2):
+        if self._use_kernels():
+            values = self._close_array()
+            sma = self.kernels.sma(values, period)
+            std = self.kernels.rolling_std(values, period)
+            return self._as_series(sma + std * std_dev), self._as_series(sma - std * std_dev)
         series = self._get_series('Close')
         sma = series.rolling(window=period).mean()
         std = series.rolling(window=period).std()
@@ -86,6 +121,14 @@ class StockAnalyzer:
         if len(series) < 2:
             return {}
             
+        if self._use_kernels():
+            values = self._close_array()
+            return {
+                "TotalReturn12m": float(self.kernels.total_return(values, 252)),
+                "MaxDrawdown": float(self.kernels.drawdown(values).min()) * 100,
+                "CurrentPrice": float(values[-1])
+            }
+            
         current_price = float(series.iloc[-1])
         # Approx 12 months ago (252 trading days)
         limit = min(252, len(series)-1)
@@ -129,8 +172,8 @@ class StockAnalyzer:
         is_bullish_trend = current_price > current_sma200
         trend_status = "BULLISH" if is_bullish_trend else "BEARISH"
         
-        # Golden/Death Cross (simplified check of current state)
-        # Ideally we check recent crossover, but current state gives primary trend
+        # Golden/Death Cross (current state; actual crossovers are detected
+        # by AlertEngine comparing consecutive reports)
         cross_signal = "Golden Cross (50 > 200)" if current_sma50 > current_sma200 else "Death Cross (50 < 200)"
 
         # 2. Momentum
@@ -151,6 +194,8 @@ class StockAnalyzer:
 
         # 3. Volatility
         upper, lower = self.calculate_bollinger_bands()
+        current_upper = upper.iloc[-1]
+        current_lower = lower.iloc[-1]
         # Bandwidth could indicate volatility squeezing
         
         # 4. Quantitative
@@ -174,7 +219,13 @@ class StockAnalyzer:
         report["Momentum"] = {
             "RSI": round(current_rsi, 2),
             "RSI_Status": momentum_status,
-            "MACD_Signal": macd_status
+            "MACD_Signal": macd_status,
+            "MACD": round(current_macd, 4),
+            "MACD_Signal_Line": round(current_signal, 4)
+        }
+        report["Volatility"] = {
+            "BB_Upper": round(current_upper, 2),
+            "BB_Lower": round(current_lower, 2)
         }
         report["Quantitative"] = {
             "Return_12m_Percent": round(metrics.get("TotalReturn12m", 0.0), 2),
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from stock_analyzer import StockAnalyzer
+
+BACKENDS = ["numpy", "numba"]
+
+def make_history(length=600, seed=42):
+    """Random-walk price history shaped like a yf.download() frame."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, length))
+    index = pd.bdate_range("2020-01-01", periods=length)
+    return pd.DataFrame({"Close": close}, index=index)
+
+def assert_same(expected, actual, name):
+    np.testing.assert_allclose(
+        np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+        rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name
+    )
+
+def test_indicator_parity():
+    data = make_history()
+    reference = StockAnalyzer(data, backend="pandas")
+    for backend in BACKENDS:
+        analyzer = StockAnalyzer(data, backend=backend)
+        for period in (5, 20, 50, 200):
+            assert_same(reference.calculate_sma(period), analyzer.calculate_sma(period), f"{backend} SMA{period}")
+        assert_same(reference.calculate_rsi(14), analyzer.calculate_rsi(14), f"{backend} RSI")
+        for ref, got, name in zip(reference.calculate_macd(), analyzer.calculate_macd(), ("line", "signal", "hist")):
+            assert_same(ref, got, f"{backend} MACD {name}")
+        for ref, got, name in zip(reference.calculate_bollinger_bands(), analyzer.calculate_bollinger_bands(), ("upper", "lower")):
+            assert_same(ref, got, f"{backend} Bollinger {name}")
+        ref_metrics = reference.calculate_metrics()
+        for key, value in analyzer.calculate_metrics().items():
+            assert_same(ref_metrics[key], value, f"{backend} {key}")
+
+def test_evaluate_parity():
+    data = make_history()
+    expected = StockAnalyzer(data, backend="pandas").evaluate()
+    for backend in BACKENDS:
+        assert StockAnalyzer(data, backend=backend).evaluate() == expected, backend
+
+def test_short_and_flat_series():
+    # Shorter than the window and a flat series (0/0 in RSI) must give the same NaNs
+    for data in (make_history(length=10), pd.DataFrame({"Close": np.full(60, 50.0)})):
+        reference = StockAnalyzer(data, backend="pandas")
+        for backend in BACKENDS:
+            analyzer = StockAnalyzer(data, backend=backend)
+            assert_same(reference.calculate_sma(20), analyzer.calculate_sma(20), f"{backend} SMA20")
+            assert_same(reference.calculate_rsi(14), analyzer.calculate_rsi(14), f"{backend} RSI")
+
+def test_missing_close_parity():
+    # A NaN close must not poison every later bar (kernels fall back to pandas)
+    data = make_history(length=400)
+    data.iloc[100, 0] = np.nan
+    reference = StockAnalyzer(data, backend="pandas")
+    for backend in BACKENDS:
+        analyzer = StockAnalyzer(data, backend=backend)
+        assert_same(reference.calculate_sma(50), analyzer.calculate_sma(50), f"{backend} SMA50")
+        for ref, got, name in zip(reference.calculate_macd(), analyzer.calculate_macd(), ("line", "signal", "hist")):
+            assert_same(ref, got, f"{backend} MACD {name}")
+        ref_metrics = reference.calculate_metrics()
+        for key, value in analyzer.calculate_metrics().items():
+            assert_same(ref_metrics[key], value, f"{backend} {key}")
+        assert analyzer.evaluate() == reference.evaluate(), backend
+
+if __name__ == "__main__":
+    test_indicator_parity()
+    test_evaluate_parity()
+    test_short_and_flat_series()
+    test_missing_close_parity()
+    print("All indicator backends match the pandas implementation.")
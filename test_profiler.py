@@ -0,0 +1,58 @@
+import os
+import tempfile
+import threading
+import time
+from profiler import CycleProfiler
+
+def test_dump_and_stop_before_any_cycle():
+    # 'profile start' then 'profile dump'/'profile stop' while the monitor sleeps
+    output_dir = os.path.join(tempfile.mkdtemp(), "profiles")
+    profiler = CycleProfiler(output_dir=output_dir)
+    profiler.start(cycles=2)
+    profiler.dump()
+    assert profiler.armed
+    profiler.stop()
+    assert not profiler.armed
+    assert not os.path.exists(output_dir)
+
+def test_profiles_requested_cycles():
+    output_dir = os.path.join(tempfile.mkdtemp(), "profiles")
+    profiler = CycleProfiler(output_dir=output_dir)
+    profiler.start(cycles=1)
+    profiler.begin_cycle()
+    sum(i * i for i in range(10000))
+    profiler.end_cycle()
+    assert not profiler.armed
+    assert any(name.endswith(".pstats") for name in os.listdir(output_dir))
+
+def test_stop_while_cycle_starts():
+    # 'profile stop' lands between begin_cycle's armed check and its lock
+    profiler = CycleProfiler(output_dir=os.path.join(tempfile.mkdtemp(), "profiles"))
+    profiler.start(cycles=1)
+    with profiler._lock:
+        monitor = threading.Thread(target=profiler.begin_cycle)
+        monitor.start()
+        time.sleep(0.1)
+        profiler._finish()
+    monitor.join()
+    assert not profiler.armed
+    assert profiler._profile is None and not profiler._in_cycle
+
+def test_sampled_cycle_writes_folded_stacks():
+    output_dir = os.path.join(tempfile.mkdtemp(), "profiles")
+    profiler = CycleProfiler(output_dir=output_dir)
+    profiler.start(cycles=1, sample_interval=0.001)
+    profiler.begin_cycle()
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        sum(i * i for i in range(1000))
+    profiler.end_cycle()
+    assert not profiler._sampler.is_alive()
+    assert any(name.endswith(".folded") for name in os.listdir(output_dir))
+
+if __name__ == "__main__":
+    test_dump_and_stop_before_any_cycle()
+    test_profiles_requested_cycles()
+    test_stop_while_cycle_starts()
+    test_sampled_cycle_writes_folded_stacks()
+    print("Profiler checks passed.")
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from risk_analyzer import PortfolioRisk
+
+TICKERS = ["A", "B", "C", "SPY"]
+WINDOW = 20
+
+def make_closes(length=120, seed=7):
+    """Random-walk close prices, one column per ticker (benchmark included)."""
+    rng = np.random.default_rng(seed)
+    values = 100 * np.cumprod(1 + rng.normal(0.0005, 0.02, (length, len(TICKERS))), axis=0)
+    return pd.DataFrame(values, index=pd.bdate_range("2023-01-02", periods=length), columns=TICKERS)
+
+def intraday(row, seed):
+    """The same bar as seen before the session closed."""
+    rng = np.random.default_rng(seed)
+    return row * (1 + rng.normal(0, 0.01, len(row)))
+
+def assert_same_model(expected, actual, name):
+    np.testing.assert_allclose(actual.covariance().to_numpy(), expected.covariance().to_numpy(),
+                               rtol=1e-9, atol=1e-12, err_msg=f"{name} covariance")
+    for attr in ("equity", "peak", "max_drawdown"):
+        np.testing.assert_allclose(getattr(actual, attr), getattr(expected, attr), rtol=1e-9, atol=1e-12,
+                                   err_msg=f"{name} {attr}")
+    assert actual.last_date == expected.last_date, name
+
+def test_replace_partial_bar():
+    # Every bar is first seen intraday, then replaced by the final close; the window
+    # is shorter than the series so replacements also have to undo evictions
+    closes = make_closes()
+    seed = closes.iloc[:40].copy()
+    seed.iloc[-1] = intraday(seed.iloc[-1], 0)
+    model = PortfolioRisk(seed, benchmark="SPY", window=WINDOW)
+    model.update(closes.index[39], closes.iloc[39].to_dict())
+    assert_same_model(PortfolioRisk(closes.iloc[:40], benchmark="SPY", window=WINDOW), model, "seed")
+
+    for i in range(40, len(closes)):
+        date = closes.index[i]
+        assert model.update(date, dict(zip(TICKERS, intraday(closes.iloc[i].to_numpy(), i))))
+        assert model.update(date, closes.iloc[i].to_dict())
+        expected = PortfolioRisk(closes.iloc[:i + 1], benchmark="SPY", window=WINDOW)
+        assert_same_model(expected, model, f"bar {i}")
+
+    assert not model.update(closes.index[0], closes.iloc[0].to_dict())
+
+def test_missing_and_nan_prices_carry_forward():
+    # A ticker left out of an update, or with a NaN close, keeps its last price,
+    # like the seed's ffill
+    closes = make_closes()
+    reference = closes.copy()
+    model = PortfolioRisk(closes.iloc[:40], benchmark="SPY", window=WINDOW)
+    for i in range(40, len(closes)):
+        prices = closes.iloc[i].to_dict()
+        if i % 7 == 0:
+            del prices["B"]
+            reference.iloc[i, TICKERS.index("B")] = np.nan
+        if i % 11 == 0:
+            prices["A"] = np.nan
+            reference.iloc[i, TICKERS.index("A")] = np.nan
+        model.update(closes.index[i], prices)
+        assert_same_model(PortfolioRisk(reference.iloc[:i + 1], benchmark="SPY", window=WINDOW), model, f"bar {i}")
+
+    report = model.report()
+    assert np.isfinite(report["Portfolio"]["Volatility_Percent"])
+    assert np.isfinite(report["Portfolio"]["Drawdown_Percent"])
+    assert np.isfinite(report["Tickers"]["A"]["Beta"])
+
+if __name__ == "__main__":
+    test_replace_partial_bar()
+    test_missing_and_nan_prices_carry_forward()
+    print("Incremental risk model matches a full rebuild.")